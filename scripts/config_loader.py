@@ -1,8 +1,9 @@
 """Configuration loader for video management system."""
 
 import os
+from functools import cached_property
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import yaml
 
@@ -85,9 +86,9 @@ class ConfigLoader:
             return self.credentials["aws"]["secret_access_key"]
         return self.secrets.get("aws", {}).get("secret_access_key", "")
 
-    @property
+    @cached_property
     def db_connection_string(self) -> str:
-        """Build PostgreSQL connection string for video_management database."""
+        """Build PostgreSQL connection string for video_management database (once per process)."""
         return self.get_db_connection_string("peraspera_brain")
 
     def get_db_connection_string(self, db_name: str = "peraspera_brain") -> str:
@@ -132,6 +133,20 @@ class ConfigLoader:
             return self.credentials["apis"]["anthropic"]["api_key"]
         return self.secrets.get("anthropic", {}).get("api_key", "")
 
+    @property
+    def anthropic_api_keys(self) -> List[str]:
+        """Get every Anthropic API key to spread batch requests over (``api_keys`` list, else ``api_key``)."""
+        keys = self.credentials.get("apis", {}).get("anthropic", {}).get("api_keys") or \
+            self.secrets.get("anthropic", {}).get("api_keys") or []
+        if not keys and self.anthropic_api_key:
+            keys = [self.anthropic_api_key]
+        return list(keys)
+
+    @property
+    def email_sender(self) -> str:
+        """Get the verified SES From address for outgoing email."""
+        return self.settings.get("email", {}).get("sender", "")
+
     @property
     def transcription_provider(self) -> str:
         return self.settings.get("transcription", {}).get("provider", "aws")
@@ -152,8 +167,9 @@ class ConfigLoader:
     def audio_codec(self) -> str:
         return self.settings.get("video", {}).get("audio_codec", "aac")
 
-    @property
+    @cached_property
     def temp_dir(self) -> Path:
+        """Get the processing temp dir, creating it on first access only."""
         temp = self.settings.get("local", {}).get("temp_dir", "/tmp/video-processing")
         path = Path(temp)
         path.mkdir(parents=True, exist_ok=True)
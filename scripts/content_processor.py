@@ -24,12 +24,11 @@ import argparse
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple, Union
 from dataclasses import dataclass
+from pathlib import Path
 from tqdm import tqdm
 
-# Add paths for imports
-sys.path.append('/Users/josephs./internal-platform/web')
-sys.path.append('/Users/josephs./internal-platform')
-sys.path.append('/Users/josephs./internal-platform/scripts')
+# Repo root, so `scripts.*` resolves when run directly (as the other run_* scripts do)
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
 # Local imports
 from scripts.db import (
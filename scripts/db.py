@@ -7,14 +7,17 @@ from typing import List, Optional
 
 from sqlalchemy import (
     ARRAY,
+    DDL,
     BigInteger,
     Boolean,
     CheckConstraint,
     Column,
+    Computed,
     Date,
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
@@ -22,9 +25,13 @@ from sqlalchemy import (
     UniqueConstraint,
     text,
     create_engine,
+    event,
+    func,
+    select,
+    update,
 )
-from sqlalchemy.dialects.postgresql import JSONB, UUID
-from sqlalchemy.orm import Session, declarative_base, relationship, sessionmaker
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
+from sqlalchemy.orm import Session, declarative_base, deferred, relationship, sessionmaker
 
 try:
     from .config_loader import get_config
@@ -104,6 +111,14 @@ class TranscriptSegment(Base):
     confidence = Column(Numeric(5, 4))
     speaker = Column(String(100))
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    # English search vector of text, maintained by Postgres; deferred so plain segment loads skip it
+    text_tsv = deferred(Column(TSVECTOR, Computed("to_tsvector('english', text)", persisted=True)))
+
+    __table_args__ = (
+        # Segments of a transcript in playback order: WHERE transcript_id = ? ORDER BY start_time
+        Index("ix_transcript_segments_tid_start", transcript_id, start_time),
+        Index("ix_transcript_segments_text_tsv", "text_tsv", postgresql_using="gin"),
+    )
 
     # Relationships
     transcript = relationship("Transcript", back_populates="segments")
@@ -201,6 +216,24 @@ class ProcessingJob(Base):
     updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
 
 
+class BackgroundJob(Base):
+    """State and result of an in-app background job, readable from any worker."""
+
+    __tablename__ = "background_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    job_type = Column(String(100), nullable=False)  # Name of the function run, e.g. identify_speakers
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=True)  # Submitter
+    status = Column(String(20), nullable=False, default="running")  # running, completed, failed
+    result = Column(JSONB, nullable=True)
+    error_message = Column(Text, nullable=True)  # For operators; not returned to clients
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Expiry sweep: WHERE created_at < ?
+    __table_args__ = (Index("ix_background_jobs_created_at", created_at),)
+
+
 class ScriptFeedback(Base):
     """Store user feedback on generated scripts for few-shot learning."""
 
@@ -234,6 +267,27 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
     last_login = Column(DateTime(timezone=True))
 
+    # Trigram indexes so user search's ILIKE '%q%' can use an index (requires pg_trgm)
+    __table_args__ = (
+        Index(
+            "users_name_trgm_gin", name,
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}, postgresql_where=text("is_active = 1"),
+        ),
+        Index(
+            "users_email_trgm_gin", email,
+            postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}, postgresql_where=text("is_active = 1"),
+        ),
+        # Prefix (autocomplete) lookups: lower(col) LIKE 'q%' as a btree range scan
+        Index(
+            "users_name_lower_pattern", func.lower(name).label("name_lower"),
+            postgresql_ops={"name_lower": "text_pattern_ops"},
+        ),
+        Index(
+            "users_email_lower_pattern", func.lower(email).label("email_lower"),
+            postgresql_ops={"email_lower": "text_pattern_ops"},
+        ),
+    )
+
     # Relationships
     conversations = relationship("Conversation", back_populates="user", cascade="all, delete-orphan")
     projects = relationship("Project", back_populates="user", cascade="all, delete-orphan")
@@ -241,6 +295,9 @@ class User(Base):
     password_reset_tokens = relationship("PasswordResetToken", back_populates="user", cascade="all, delete-orphan")
 
 
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+
 class Project(Base):
     """Projects group conversations with shared context and instructions."""
 
@@ -256,6 +313,9 @@ class Project(Base):
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Project list: WHERE user_id = ? AND is_archived = 0 ORDER BY created_at DESC
+    __table_args__ = (Index("ix_projects_user_active_created", user_id, is_archived, created_at.desc()),)
+
     # Relationships
     user = relationship("User", back_populates="projects")
     conversations = relationship("Conversation", back_populates="project", cascade="all, delete-orphan")
@@ -274,9 +334,17 @@ class Conversation(Base):
     is_collaborative = Column(Integer, default=0)  # 1 if shared with team
     starred = Column(Boolean, default=False)  # Whether chat is starred by user
     preferred_model = Column(String(50), default="gpt-4o")  # User's preferred AI model for this conversation
+    message_count = Column(Integer, nullable=False, default=0, server_default="0")  # Maintained by ChatMessage events
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # Conversation list: WHERE user_id = ? ORDER BY updated_at DESC
+        Index("ix_conv_user_updated", user_id, updated_at.desc()),
+        # Recents with starred chats pinned: WHERE user_id = ? ORDER BY starred DESC, updated_at DESC
+        Index("ix_conv_user_star_updated", user_id, starred.desc(), updated_at.desc()),
+    )
+
     # Relationships
     user = relationship("User", back_populates="conversations")
     project = relationship("Project", back_populates="conversations")
@@ -301,11 +369,33 @@ class ChatMessage(Base):
     model = Column(String(50))  # Which model generated it (for assistant messages)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
 
+    __table_args__ = (Index("ix_chat_messages_conversation_id", conversation_id),)
+
     # Relationships
     conversation = relationship("Conversation", back_populates="messages")
     sender = relationship("User", foreign_keys=[user_id])
 
 
+@event.listens_for(ChatMessage, "after_insert")
+def _increment_message_count(mapper, connection, target):
+    """Keep Conversation.message_count in step with inserted messages."""
+    connection.execute(
+        update(Conversation.__table__)
+        .where(Conversation.__table__.c.id == target.conversation_id)
+        .values(message_count=Conversation.__table__.c.message_count + 1)
+    )
+
+
+@event.listens_for(ChatMessage, "after_delete")
+def _decrement_message_count(mapper, connection, target):
+    """Keep Conversation.message_count in step with deleted messages."""
+    connection.execute(
+        update(Conversation.__table__)
+        .where(Conversation.__table__.c.id == target.conversation_id)
+        .values(message_count=Conversation.__table__.c.message_count - 1)
+    )
+
+
 class ChatParticipant(Base):
     """Users invited to collaborate on a conversation."""
 
@@ -318,6 +408,8 @@ class ChatParticipant(Base):
     invited_by = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
     joined_at = Column(DateTime(timezone=True), default=datetime.utcnow)
 
+    # One row per (conversation, user); its unique index also serves participant EXISTS checks
+    # and is the conflict target for invite upserts
     __table_args__ = (UniqueConstraint("conversation_id", "user_id"),)
 
     # Relationships
@@ -337,9 +429,20 @@ class ClipComment(Base):
     clip_index = Column(Integer, nullable=False)  # Which clip in the message's clips_json
     content = Column(Text, nullable=False)
     mentions = Column(JSONB, default=[])  # @mentions in comment
-    is_regenerate_request = Column(Integer, default=0)  # 1 if this is a request to regenerate the clip
+    # 1 if this is a request to regenerate the clip (@mv-video); derived by Postgres from mentions
+    is_regenerate_request = Column(
+        Integer,
+        Computed("""CASE WHEN mentions @> '["mv-video"]' OR mentions @> '["mv_video"]' THEN 1 ELSE 0 END""", persisted=True),
+    )
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
 
+    __table_args__ = (
+        # Paged comment threads: WHERE conversation_id = ? AND clip_index = ? ORDER BY created_at DESC LIMIT n
+        Index("ix_clip_comments_conv_clip_created", conversation_id, clip_index, created_at),
+        # Mention lookups: WHERE mentions @> '["name"]'
+        Index("ix_clip_comments_mentions", mentions, postgresql_using="gin", postgresql_ops={"mentions": "jsonb_path_ops"}),
+    )
+
     # Relationships
     conversation = relationship("Conversation")
     message = relationship("ChatMessage")
@@ -392,10 +495,13 @@ class AILog(Base):
 
     # Performance & Status
     success = Column(Integer, default=1)  # 1 = success, 0 = failure
+    cache_hit = Column(Integer, default=0)  # 1 = answered from the copy response cache, no API call
     error_message = Column(Text, nullable=True)  # Error message if failed
     latency_ms = Column(Float, nullable=True)  # Time taken in milliseconds
     input_tokens = Column(Integer, nullable=True)  # Token count (if available)
     output_tokens = Column(Integer, nullable=True)
+    cache_read_input_tokens = Column(Integer, nullable=True)  # Prompt-cache hits (billed at ~10%)
+    cache_creation_input_tokens = Column(Integer, nullable=True)  # Tokens written to the prompt cache
     total_cost = Column(Float, nullable=True)  # Total cost in USD for this call
     input_cost = Column(Float, nullable=True)  # Cost for input tokens
     output_cost = Column(Float, nullable=True)  # Cost for output tokens
@@ -413,6 +519,9 @@ class AILog(Base):
     # Timestamps
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
 
+    # Log browsing: ORDER BY created_at DESC, optionally filtered by request_type/model
+    __table_args__ = (Index("ix_ai_logs_created_type_model", created_at.desc(), request_type, model),)
+
     # Relationships
     user = relationship("User")
     conversation = relationship("Conversation")
@@ -521,6 +630,11 @@ class Persona(Base):
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
     updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # Copy-prompt text, rebuilt by the events below when the persona or its posts change
+    voice_profile_cached = Column(Text)
+    samples_cached = Column(Text)
+    cache_version = Column(Integer, nullable=False, default=0, server_default="0")
+
     # Relationships
     creator = relationship("User")
     documents = relationship("Document", back_populates="persona", cascade="all, delete-orphan")
@@ -609,6 +723,77 @@ class SocialPost(Base):
     creator = relationship("User")
 
 
+# Recent posts kept in Persona.samples_cached as voice examples
+PERSONA_SAMPLE_POSTS = 5
+
+
+def build_voice_profile(persona: "Persona") -> str:
+    """Describe a persona's voice for copy prompts from its manual configuration."""
+    lines = [f"You write social media copy in the voice of {persona.name}."]
+    if persona.description:
+        lines.append(f"About them: {persona.description}")
+    if persona.tone:
+        lines.append(f"Tone: {persona.tone}")
+    if persona.style_notes:
+        lines.append(f"Style notes: {persona.style_notes}")
+    if persona.topics:
+        lines.append(f"Topics they discuss: {', '.join(persona.topics)}")
+    if persona.vocabulary:
+        lines.append(f"Phrases they use: {', '.join(persona.vocabulary)}")
+    return '\n\n'.join(lines)
+
+
+@event.listens_for(Persona, "before_insert")
+@event.listens_for(Persona, "before_update")
+def _refresh_voice_profile(mapper, connection, target):
+    """Rebuild Persona.voice_profile_cached whenever the persona is saved."""
+    target.voice_profile_cached = build_voice_profile(target)
+    target.cache_version = (target.cache_version or 0) + 1
+
+
+@event.listens_for(SocialPost, "after_insert")
+@event.listens_for(SocialPost, "after_update")
+@event.listens_for(SocialPost, "after_delete")
+def _refresh_persona_samples(mapper, connection, target):
+    """Rebuild the owning persona's samples_cached from its latest posts."""
+    if target.persona_id is None:
+        return
+    connection.execute(
+        update(Persona.__table__)
+        .where(Persona.__table__.c.id == target.persona_id)
+        .values(samples_cached=_persona_samples(connection, target.persona_id),
+                cache_version=Persona.__table__.c.cache_version + 1)
+    )
+
+
+def _persona_samples(connection, persona_id) -> str:
+    """A persona's latest posts joined into the samples_cached text."""
+    posts = SocialPost.__table__.c
+    contents = connection.execute(
+        select(posts.content)
+        .where(posts.persona_id == persona_id)
+        .order_by(posts.posted_at.desc().nullslast())
+        .limit(PERSONA_SAMPLE_POSTS)
+    ).scalars().all()
+    return '\n---\n'.join(contents)
+
+
+def backfill_persona_caches() -> int:
+    """One-off: fill voice_profile_cached and samples_cached for personas saved before those columns existed.
+
+    Run once after adding the columns to an existing database:
+        python -c "from scripts.db import backfill_persona_caches; backfill_persona_caches()"
+    Returns the number of personas updated.
+    """
+    with DatabaseSession() as session:
+        personas = session.query(Persona).filter(Persona.voice_profile_cached.is_(None)).all()
+        connection = session.connection()
+        for persona in personas:
+            # Saving runs _refresh_voice_profile, which rebuilds the voice profile and bumps cache_version
+            persona.samples_cached = _persona_samples(connection, persona.id)
+        return len(personas)
+
+
 class AudioRecording(Base):
     """Audio recordings with transcripts (Otter AI imports, Zoom recordings, etc.)."""
 
@@ -670,9 +855,17 @@ class AudioSegment(Base):
     # Content
     text = Column(Text, nullable=False)
     speaker = Column(String(100))
+    # English search vector of text, maintained by Postgres; deferred so plain segment loads skip it
+    text_tsv = deferred(Column(TSVECTOR, Computed("to_tsvector('english', text)", persisted=True)))
 
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
 
+    __table_args__ = (
+        # Segments of a recording in playback order: WHERE audio_id = ? ORDER BY start_time
+        Index("ix_audio_segments_audio_start", audio_id, start_time),
+        Index("ix_audio_segments_text_tsv", "text_tsv", postgresql_using="gin"),
+    )
+
     # Relationships
     audio = relationship("AudioRecording", back_populates="segments")
 
@@ -1067,13 +1260,16 @@ class RAGChunk(Base):
 _engine = None
 _SessionLocal = None
 
+# Compiled-statement cache entries; the default 500 churns with this many models
+QUERY_CACHE_SIZE = 1200
+
 
 def get_engine():
     """Get or create the database engine."""
     global _engine
     if _engine is None:
         config = get_config()
-        _engine = create_engine(config.db_connection_string, pool_pre_ping=True)
+        _engine = create_engine(config.db_connection_string, pool_pre_ping=True, query_cache_size=QUERY_CACHE_SIZE)
     return _engine
 
 
@@ -1085,20 +1281,26 @@ def get_session_factory():
     return _SessionLocal
 
 
-def get_session() -> Session:
+def get_session(expire_on_commit: bool = True) -> Session:
     """Get a new database session."""
     SessionLocal = get_session_factory()
-    return SessionLocal()
+    return SessionLocal(expire_on_commit=expire_on_commit)
 
 
 class DatabaseSession:
-    """Context manager for database sessions."""
+    """Context manager for database sessions.
+
+    Pass ``expire_on_commit=False`` for write paths that read attributes back
+    off the instances after committing (ids, titles, timestamps); the values
+    are then served from memory instead of reloading each row with a SELECT.
+    """
 
-    def __init__(self):
+    def __init__(self, expire_on_commit: bool = True):
         self.session: Optional[Session] = None
+        self.expire_on_commit = expire_on_commit
 
     def __enter__(self) -> Session:
-        self.session = get_session()
+        self.session = get_session(expire_on_commit=self.expire_on_commit)
         return self.session
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """Pre-generate thumbnails for all videos and store in S3."""
 
+import logging
 import subprocess
 import sys
 import tempfile
@@ -20,6 +21,8 @@ from sqlalchemy.orm import sessionmaker, declarative_base
 import uuid
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 Base = declarative_base()
 
 
@@ -49,7 +52,7 @@ def get_or_download_video(video_id, s3_key, s3_client, bucket):
         s3_client.download_file(bucket, s3_key, str(local_path))
         return str(local_path)
     except Exception as e:
-        print(f"  Download error: {e}")
+        logger.warning("Download of %s failed: %s", s3_key, e)
         return None
 
 
@@ -86,7 +89,7 @@ def generate_thumbnail_for_video(video, s3_client, bucket, ffmpeg_path):
             result = subprocess.run(cmd, capture_output=True, timeout=120)
 
         if result.returncode != 0 or not Path(thumb_path).exists():
-            print(f"  FAILED: {result.stderr.decode()[:100]}")
+            logger.warning("ffmpeg failed for %s: %s", video.id, result.stderr.decode(errors='replace')[:100])
             return None
 
         # Upload to S3
@@ -101,7 +104,7 @@ def generate_thumbnail_for_video(video, s3_client, bucket, ffmpeg_path):
         return thumb_s3_key
 
     except Exception as e:
-        print(f"  ERROR: {e}")
+        logger.warning("Thumbnail generation failed for %s: %s", video.id, e)
         return None
     finally:
         # Always clean up cached video and temp thumbnail to free disk space
@@ -112,6 +115,7 @@ def generate_thumbnail_for_video(video, s3_client, bucket, ffmpeg_path):
 
 
 def main():
+    logging.basicConfig(level=logging.INFO, format="  %(message)s")
     config = get_config()
     bucket = config.s3_bucket
 
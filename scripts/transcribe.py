@@ -3,6 +3,7 @@
 import json
 import logging
 import time
+from functools import lru_cache
 from datetime import datetime
 from pathlib import Path
 from typing import List, Optional, Tuple
@@ -17,8 +18,9 @@ from .db import DatabaseSession, ProcessingJob, Transcript, TranscriptSegment, V
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
 def get_transcribe_client():
-    """Get configured AWS Transcribe client."""
+    """Get the configured AWS Transcribe client (built once; boto3 clients are thread-safe)."""
     config = get_config()
     return boto3.client(
         "transcribe",
@@ -28,8 +30,9 @@ def get_transcribe_client():
     )
 
 
+@lru_cache(maxsize=1)
 def get_s3_client():
-    """Get configured S3 client."""
+    """Get the configured S3 client (built once; boto3 clients are thread-safe)."""
     config = get_config()
     return boto3.client(
         "s3",
@@ -417,16 +420,14 @@ def get_transcript_segments(transcript_id: UUID) -> List[TranscriptSegment]:
 def search_transcript(video_id: UUID, query: str) -> List[dict]:
     """Search transcript segments for a query string."""
     with DatabaseSession() as session:
-        transcript = session.query(Transcript).filter(
+        # Match segments of the latest completed transcript in one round trip; a re-transcribed
+        # video keeps its older transcripts, whose segments would otherwise duplicate these
+        latest_transcript_id = session.query(Transcript.id).filter(
             Transcript.video_id == video_id,
             Transcript.status == "completed"
-        ).first()
-
-        if not transcript:
-            return []
-
+        ).order_by(Transcript.created_at.desc()).limit(1).scalar_subquery()
         segments = session.query(TranscriptSegment).filter(
-            TranscriptSegment.transcript_id == transcript.id,
+            TranscriptSegment.transcript_id == latest_transcript_id,
             TranscriptSegment.text.ilike(f"%{query}%")
         ).order_by(TranscriptSegment.start_time).all()
 
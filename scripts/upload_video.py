@@ -3,6 +3,7 @@
 import hashlib
 import logging
 import subprocess
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional, Tuple
 from uuid import UUID
@@ -17,8 +18,9 @@ from .db import DatabaseSession, Video
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
 def get_s3_client():
-    """Get configured S3 client."""
+    """Get the configured S3 client (built once; boto3 clients are thread-safe)."""
     config = get_config()
     return boto3.client(
         "s3",
@@ -0,0 +1,185 @@
+"""
+AI Log Service
+
+Buffers ai_logs rows in memory and writes them in batches from a
+background thread, keeping the insert and commit off the AI request path,
+and serves the paginated AI log listing.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, insert, select
+
+from scripts.db import AILog, DatabaseSession, get_session
+
+logger = logging.getLogger(__name__)
+
+
+class AILogBatchWriter:
+    """Queue-backed batch writer for AILog rows."""
+
+    # A batch is written when it reaches MAX_ROWS or has waited FLUSH_INTERVAL_SECONDS
+    MAX_ROWS = 200
+    FLUSH_INTERVAL_SECONDS = 1.0
+    # Beyond this many pending rows, enqueue writes directly instead of growing the queue
+    MAX_PENDING = 10_000
+
+    _queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=MAX_PENDING)
+    _thread = None
+    _start_lock = threading.Lock()
+
+    @classmethod
+    def enqueue(cls, row: Dict[str, Any]) -> None:
+        """Queue one AILog row (column name -> value) for the next batch."""
+        cls._ensure_started()
+        try:
+            cls._queue.put_nowait(row)
+        except queue.Full:
+            logger.warning("AI log queue full; writing row directly")
+            cls._write([row])
+
+    @classmethod
+    def _ensure_started(cls) -> None:
+        """Start the flusher thread on first use and drain the queue at interpreter exit."""
+        if cls._thread is None:
+            with cls._start_lock:
+                if cls._thread is None:
+                    cls._thread = threading.Thread(target=cls._run, name='ai-log-writer', daemon=True)
+                    cls._thread.start()
+                    atexit.register(cls.flush)
+
+    @classmethod
+    def _run(cls) -> None:
+        """Collect rows until a batch is full or the flush interval passes, then write it."""
+        while True:
+            batch = [cls._queue.get()]
+            deadline = time.monotonic() + cls.FLUSH_INTERVAL_SECONDS
+            while len(batch) < cls.MAX_ROWS:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(cls._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            cls._write(batch)
+
+    @classmethod
+    def flush(cls) -> None:
+        """Write everything currently queued (used at shutdown)."""
+        batch = []
+        while True:
+            try:
+                batch.append(cls._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= cls.MAX_ROWS:
+                cls._write(batch)
+                batch = []
+        if batch:
+            cls._write(batch)
+
+    @staticmethod
+    def _write(rows: List[Dict[str, Any]]) -> None:
+        """Insert a batch in one transaction; failures are logged, never raised to callers.
+
+        A Core executemany skips the ORM unit of work entirely; on psycopg2
+        SQLAlchemy sends it as multi-row INSERT ... VALUES pages.
+        """
+        try:
+            with DatabaseSession() as db_session:
+                db_session.execute(insert(AILog), rows)
+        except Exception as e:
+            logger.error("Failed to write %d AI log rows: %s", len(rows), e)
+
+
+class AILogService:
+    """Read side of the AI log."""
+
+    MAX_PAGE_SIZE = 200
+    # The listing shows previews; the full text stays in the database
+    PROMPT_PREVIEW_CHARS = 500
+    RESPONSE_PREVIEW_CHARS = 1000
+
+    @staticmethod
+    def _preview(text: Optional[str], length: Optional[int], limit: int) -> Optional[str]:
+        """Mark a truncated preview with an ellipsis."""
+        if text is not None and length > limit:
+            return text + '\u2026'
+        return text
+
+    @classmethod
+    def list_logs(cls, limit: int = 50, offset: int = 0, request_type: Optional[str] = None,
+                  model: Optional[str] = None) -> Dict[str, Any]:
+        """Get one page of AI logs, newest first, with the total for the filter.
+
+        The total rides along on every row as ``count(*) OVER ()``, so the
+        page and the count come back from a single scan instead of a
+        separate ``.count()`` round-trip. Prompt and response are cut to
+        their preview length in the SELECT, so only the previews cross the
+        wire.
+        """
+        limit = max(1, min(limit, cls.MAX_PAGE_SIZE))
+        offset = max(0, offset)
+
+        stmt = select(
+            AILog.id, AILog.created_at, AILog.request_type, AILog.model, AILog.user_id,
+            AILog.conversation_id, AILog.success, AILog.cache_hit, AILog.error_message, AILog.latency_ms,
+            AILog.input_tokens, AILog.output_tokens, AILog.total_cost, AILog.clips_generated,
+            func.substr(AILog.prompt, 1, cls.PROMPT_PREVIEW_CHARS).label('prompt'),
+            func.length(AILog.prompt).label('prompt_length'),
+            func.substr(AILog.response, 1, cls.RESPONSE_PREVIEW_CHARS).label('response'),
+            func.length(AILog.response).label('response_length'),
+            func.count().over().label('total')
+        )
+        if request_type:
+            stmt = stmt.where(AILog.request_type == request_type)
+        if model:
+            stmt = stmt.where(AILog.model == model)
+        stmt = stmt.order_by(AILog.created_at.desc()).offset(offset).limit(limit)
+
+        with get_session() as session:
+            rows = session.execute(stmt).all()
+
+        # Past the last page the window has no rows to ride on; fall back to a plain count
+        if rows:
+            total = rows[0].total
+        elif offset:
+            with get_session() as session:
+                total = session.execute(
+                    select(func.count()).select_from(stmt.order_by(None).offset(None).limit(None).subquery())
+                ).scalar_one()
+        else:
+            total = 0
+
+        return {
+            'logs': [
+                {
+                    'id': row.id,
+                    'created_at': row.created_at,
+                    'request_type': row.request_type,
+                    'model': row.model,
+                    'user_id': row.user_id,
+                    'conversation_id': row.conversation_id,
+                    'success': bool(row.success),
+                    'cache_hit': bool(row.cache_hit),
+                    'error_message': row.error_message,
+                    'latency_ms': row.latency_ms,
+                    'input_tokens': row.input_tokens,
+                    'output_tokens': row.output_tokens,
+                    'total_cost': row.total_cost,
+                    'clips_generated': row.clips_generated,
+                    'prompt': cls._preview(row.prompt, row.prompt_length, cls.PROMPT_PREVIEW_CHARS),
+                    'response': cls._preview(row.response, row.response_length, cls.RESPONSE_PREVIEW_CHARS),
+                }
+                for row in rows
+            ],
+            'total': total,
+            'limit': limit,
+            'offset': offset,
+        }
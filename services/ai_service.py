@@ -1,6 +1,651 @@
-"""AI Service - Stub Implementation"""
+"""
+AI Service
+
+Shared AI provider clients for the Internal Platform.
+"""
+
+import asyncio
+import hashlib
+import itertools
+import json
+import re
+import string
+import threading
+import time
+import uuid
+from datetime import datetime
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, Iterator, List, Optional
+from uuid import UUID
+
+import anthropic
+import httpx
+import orjson
+from flask import Response, stream_with_context
+
+from scripts.config_loader import get_config
+from scripts.db import Persona, build_voice_profile, get_session
+from services.ai_log_service import AILogBatchWriter
+from services.cache_service import TTLCache
+from services.job_service import JobService
+from services.transcript_service import TranscriptService
+from services.usage_limits_service import UsageLimitsService
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_JSON_DECODER = json.JSONDecoder()
+
+# Short model names (as stored in AILog.model) to provider model ids; read-only and built once
+_MODEL_MAPPING = MappingProxyType({
+    'claude-sonnet': 'claude-sonnet-4-20250514',
+})
+_DEFAULT_API_MODEL = _MODEL_MAPPING['claude-sonnet']
+
+# Platform guidance appended to a persona's voice profile for copy requests
+_PLATFORM_GUIDES = MappingProxyType({
+    'linkedin': "Write for LinkedIn: a strong first line, short paragraphs, 150-300 words, at most 3 hashtags.",
+    'x': "Write for X: under 280 characters, one idea, no more than 2 hashtags.",
+    'facebook': "Write for Facebook: conversational, 80-200 words, end with a question or call to action.",
+})
+
+# Copy system prompt per platform, built once; a request only substitutes the persona's texts
+_COPY_SYSTEM_TEMPLATES = MappingProxyType({
+    platform: string.Template(f"$voice_profile$samples\n\n{guide}") for platform, guide in _PLATFORM_GUIDES.items()
+})
+_DEFAULT_COPY_SYSTEM_TEMPLATE = string.Template("$voice_profile$samples")
+
+
+# Anthropic ignores cache_control on blocks shorter than this many tokens
+PROMPT_CACHE_MIN_TOKENS = 1024
+
+
+@lru_cache(maxsize=1)
+def _tokenizer():
+    """Load the BPE tokenizer once per process (the table load dominates a count), or None without tiktoken.
+
+    tiktoken's o200k encoding is not Claude's tokenizer, but it is close
+    enough for cost estimates and the prompt-cache minimum check.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    return tiktoken.get_encoding('o200k_base')
+
+
+def _count(text: str) -> int:
+    """Approximate token count for text."""
+    tokenizer = _tokenizer()
+    if tokenizer is None:
+        return max(1, len(text) // 4)  # Rough approximation: 4 chars per token
+    return len(tokenizer.encode(text, disallowed_special=()))
+
+
+@lru_cache(maxsize=1024)
+def count_tokens(text: str) -> int:
+    """Approximate token count for text; repeated persona/system strings are counted once."""
+    return _count(text)
+
+
+def _trim_to_tokens(text: str, max_tokens: int) -> str:
+    """Keep the leading lines of text that fit in max_tokens.
+
+    Context is assembled most-relevant first, one entry per line, so
+    dropping whole lines from the end loses the least useful material and
+    never cuts an entry mid-sentence.
+    """
+    if max_tokens <= 0:
+        return ''
+    if count_tokens(text) <= max_tokens:
+        return text
+    kept, used = [], 0
+    for line in text.splitlines(keepends=True):
+        used += _count(line)
+        if used > max_tokens:
+            break
+        kept.append(line)
+    return ''.join(kept).rstrip()
+
+
+def _extract_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """Decode the first JSON object in an AI response, ignoring any prose around it.
+
+    raw_decode from each '{' avoids running a greedy regex over the whole
+    response.
+    """
+    start = text.find('{')
+    while start != -1:
+        try:
+            obj, _ = _JSON_DECODER.raw_decode(text, start)
+        except json.JSONDecodeError:
+            start = text.find('{', start + 1)
+            continue
+        if isinstance(obj, dict):
+            return obj
+        start = text.find('{', start + 1)
+    return None
 
 
 class AIService:
-    """Stub implementation for AI Service."""
-    pass
\ No newline at end of file
+    """Service for access to AI provider clients."""
+
+    # Keepalive pool shared by every request in the process
+    MAX_KEEPALIVE_CONNECTIONS = 20
+    MAX_CONNECTIONS = 100
+    REQUEST_TIMEOUT_SECONDS = 60.0
+    # Idle connections stay open this long, so traffic after a quiet spell skips the TLS handshake
+    KEEPALIVE_EXPIRY_SECONDS = 300.0
+    ANTHROPIC_BASE_URL = 'https://api.anthropic.com'
+
+    DEFAULT_MAX_TOKENS = 2000
+
+    # Identical regenerate prompts (client retries, double clicks) reuse the last result
+    REGENERATE_CACHE_TTL = 300
+    _regenerate_cache = TTLCache(ttl_seconds=REGENERATE_CACHE_TTL)
+
+    # Copy for the same persona prompt, context and (normalized) request is reused for a day
+    COPY_CACHE_TTL = 24 * 3600
+    _copy_cache = TTLCache(ttl_seconds=COPY_CACHE_TTL, max_entries=4096)
+
+    # Speaker/autofill results only change when the transcript does, so keep them for a day
+    VIDEO_ANALYSIS_CACHE_TTL = 24 * 3600
+    _video_analysis_cache = TTLCache(ttl_seconds=VIDEO_ANALYSIS_CACHE_TTL)
+
+    _anthropic_client: Optional[anthropic.Anthropic] = None
+    _http_client: Optional[httpx.Client] = None
+    _client_lock = threading.Lock()
+
+    # Batches run on one background event loop that owns the async clients' connections
+    ASYNC_MAX_CONNECTIONS = 200
+    ASYNC_MAX_KEEPALIVE_CONNECTIONS = 100
+    _async_http_client: Optional[httpx.AsyncClient] = None
+    _async_anthropic_clients: Optional[List[anthropic.AsyncAnthropic]] = None
+    _async_client_cycle: Optional[Iterator[anthropic.AsyncAnthropic]] = None
+    _event_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def get_anthropic_client(cls) -> anthropic.Anthropic:
+        """Get the process-wide Anthropic client.
+
+        Building a client per request creates a new httpx client and pays a
+        fresh TLS handshake on first send; the shared one keeps its HTTP/2
+        connections alive across requests.
+        """
+        if cls._anthropic_client is None:
+            with cls._client_lock:
+                if cls._anthropic_client is None:
+                    cls._http_client = httpx.Client(
+                        http2=True,
+                        limits=httpx.Limits(
+                            max_connections=cls.MAX_CONNECTIONS,
+                            max_keepalive_connections=cls.MAX_KEEPALIVE_CONNECTIONS,
+                            keepalive_expiry=cls.KEEPALIVE_EXPIRY_SECONDS,
+                        ),
+                        timeout=cls.REQUEST_TIMEOUT_SECONDS,
+                    )
+                    cls._anthropic_client = anthropic.Anthropic(
+                        api_key=get_config().anthropic_api_key or None,
+                        http_client=cls._http_client,
+                    )
+        return cls._anthropic_client
+
+    @classmethod
+    def _get_event_loop(cls) -> asyncio.AbstractEventLoop:
+        """Get the process-wide background event loop, starting its thread on first use."""
+        if cls._event_loop is None:
+            with cls._client_lock:
+                if cls._event_loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name='ai-async', daemon=True).start()
+                    cls._event_loop = loop
+        return cls._event_loop
+
+    @classmethod
+    def _get_async_anthropic_clients(cls) -> List[anthropic.AsyncAnthropic]:
+        """Get one async client per configured API key.
+
+        The keys differ only in a request header, so every client shares one
+        HTTP/2 pool: a connection warmed by any key serves all of them.
+        """
+        if cls._async_anthropic_clients is None:
+            with cls._client_lock:
+                if cls._async_anthropic_clients is None:
+                    cls._async_http_client = httpx.AsyncClient(
+                        http2=True,
+                        limits=httpx.Limits(
+                            max_connections=cls.ASYNC_MAX_CONNECTIONS,
+                            max_keepalive_connections=cls.ASYNC_MAX_KEEPALIVE_CONNECTIONS,
+                            keepalive_expiry=cls.KEEPALIVE_EXPIRY_SECONDS,
+                        ),
+                        timeout=cls.REQUEST_TIMEOUT_SECONDS,
+                    )
+                    clients = [
+                        anthropic.AsyncAnthropic(api_key=api_key, http_client=cls._async_http_client)
+                        for api_key in get_config().anthropic_api_keys or [None]
+                    ]
+                    cls._async_client_cycle = itertools.cycle(clients)
+                    cls._async_anthropic_clients = clients
+        return cls._async_anthropic_clients
+
+    @classmethod
+    def prewarm(cls) -> None:
+        """Open the sync and async pools' connections to Anthropic ahead of the first request.
+
+        Call once at worker start. Each pool sends a HEAD to the API host in
+        the background so DNS and the TLS handshake are done before a user
+        waits on them; failures are ignored and the first real call simply
+        connects as usual.
+        """
+        cls.get_anthropic_client()
+        cls._get_async_anthropic_clients()
+
+        def warm_sync() -> None:
+            try:
+                cls._http_client.head(cls.ANTHROPIC_BASE_URL)
+            except httpx.HTTPError:
+                pass
+
+        async def warm_async() -> None:
+            try:
+                await cls._async_http_client.head(cls.ANTHROPIC_BASE_URL)
+            except httpx.HTTPError:
+                pass
+
+        threading.Thread(target=warm_sync, name='ai-prewarm', daemon=True).start()
+        asyncio.run_coroutine_threadsafe(warm_async(), cls._get_event_loop())
+
+    @classmethod
+    def next_async_anthropic_client(cls) -> anthropic.AsyncAnthropic:
+        """Get the next async client round-robin, so batches spread over every key's rate limit.
+
+        Only use it on _get_event_loop().
+        """
+        cls._get_async_anthropic_clients()
+        return next(cls._async_client_cycle)
+
+    @classmethod
+    def log_ai_call(cls, request_type: str, model: str, user_id: Optional[UUID] = None,
+                    conversation_id: Optional[UUID] = None, prompt: Optional[str] = None,
+                    response: Optional[str] = None, success: bool = True, error_message: Optional[str] = None,
+                    latency_ms: Optional[float] = None, input_tokens: Optional[int] = None,
+                    output_tokens: Optional[int] = None, cache_read_input_tokens: Optional[int] = None,
+                    cache_creation_input_tokens: Optional[int] = None, cache_hit: bool = False) -> None:
+        """Queue an AI call for ai_logs with its token costs and prompt-cache usage.
+
+        ``cache_hit`` marks a request answered from a response cache without
+        calling the provider.
+        """
+        costs = UsageLimitsService.estimate_request_cost(model, input_tokens or 0, output_tokens or 0)
+        # Written in batches by a background thread; same keys on every row so batches insert together
+        AILogBatchWriter.enqueue({
+            'id': uuid.uuid4(),
+            'request_type': request_type,
+            'model': model,
+            'user_id': user_id,
+            'conversation_id': conversation_id,
+            'prompt': prompt,
+            'response': response,
+            'success': 1 if success else 0,
+            'cache_hit': 1 if cache_hit else 0,
+            'error_message': error_message,
+            'latency_ms': latency_ms,
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+            'cache_read_input_tokens': cache_read_input_tokens,
+            'cache_creation_input_tokens': cache_creation_input_tokens,
+            'input_cost': costs['input_cost'],
+            'output_cost': costs['output_cost'],
+            'total_cost': costs['total_cost'],
+            'created_at': datetime.utcnow()
+        })
+
+    @classmethod
+    def regenerate_record(cls, prompt: str, user_id: Optional[UUID] = None, conversation_id: Optional[UUID] = None,
+                          model: str = 'claude-sonnet') -> Dict[str, Any]:
+        """Regenerate a record's text with Claude and log the call.
+
+        Results are cached per (model, prompt) for a few minutes so retries
+        of the same request skip the API call.
+        """
+        cache_key = (model, hashlib.sha256(prompt.encode()).hexdigest())
+        cached = cls._regenerate_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        new_text = cls._complete('regenerate_record', prompt, model, user_id, conversation_id)
+        result = {'new_text': new_text}
+        cls._regenerate_cache.set(cache_key, result)
+        return result
+
+    @classmethod
+    def submit_regenerate_record(cls, prompt: str, user_id: Optional[UUID] = None,
+                                 conversation_id: Optional[UUID] = None, model: str = 'claude-sonnet') -> str:
+        """Queue regenerate_record in the background; poll JobService.get_status with the returned id and user."""
+        return JobService.submit(user_id, cls.regenerate_record, prompt, user_id, conversation_id, model)
+
+    @staticmethod
+    def _cached_block(text: str) -> Dict[str, Any]:
+        """A system prompt block marked for Anthropic prompt caching (reused for ~5 minutes).
+
+        Blocks under PROMPT_CACHE_MIN_TOKENS can't be cached, so they are
+        sent plain rather than spending one of the request's cache breakpoints.
+        """
+        block = {"type": "text", "text": text}
+        if count_tokens(text) >= PROMPT_CACHE_MIN_TOKENS:
+            block["cache_control"] = {"type": "ephemeral"}
+        return block
+
+    @classmethod
+    def _complete(cls, request_type: str, prompt: str, model: str = 'claude-sonnet',
+                  user_id: Optional[UUID] = None, conversation_id: Optional[UUID] = None,
+                  system: Optional[List[Dict[str, Any]]] = None) -> str:
+        """Send a single-turn prompt to Claude, log it, and return the response text.
+
+        ``system`` blocks built with _cached_block are served from the
+        prompt cache on repeat calls; only ``prompt`` is billed in full.
+        """
+        start_time = time.time()
+        try:
+            response = cls.get_anthropic_client().messages.create(
+                model=_MODEL_MAPPING.get(model, _DEFAULT_API_MODEL),
+                max_tokens=cls.DEFAULT_MAX_TOKENS,
+                system=system or anthropic.NOT_GIVEN,
+                messages=[{"role": "user", "content": prompt}]
+            )
+        except Exception as e:
+            cls.log_ai_call(request_type, model, user_id, conversation_id, prompt=prompt, success=False,
+                            error_message=str(e), latency_ms=(time.time() - start_time) * 1000)
+            raise
+
+        text = response.content[0].text.strip()
+        usage = response.usage
+        cls.log_ai_call(request_type, model, user_id, conversation_id, prompt=prompt, response=text,
+                        latency_ms=(time.time() - start_time) * 1000,
+                        input_tokens=usage.input_tokens, output_tokens=usage.output_tokens,
+                        cache_read_input_tokens=usage.cache_read_input_tokens,
+                        cache_creation_input_tokens=usage.cache_creation_input_tokens)
+        return text
+
+    @classmethod
+    def _stream_complete(cls, request_type: str, prompt: str, model: str = 'claude-sonnet',
+                         user_id: Optional[UUID] = None, conversation_id: Optional[UUID] = None,
+                         system: Optional[List[Dict[str, Any]]] = None) -> Iterator[str]:
+        """Streaming _complete: yield text deltas as Claude produces them, then log the full reply.
+
+        The AILog row is queued once the stream closes, with the usage from
+        the final message; a client disconnect mid-stream is logged as a
+        failure with whatever text had arrived.
+        """
+        start_time = time.time()
+        parts: List[str] = []
+        try:
+            with cls.get_anthropic_client().messages.stream(
+                model=_MODEL_MAPPING.get(model, _DEFAULT_API_MODEL),
+                max_tokens=cls.DEFAULT_MAX_TOKENS,
+                system=system or anthropic.NOT_GIVEN,
+                messages=[{"role": "user", "content": prompt}]
+            ) as stream:
+                for text in stream.text_stream:
+                    parts.append(text)
+                    yield text
+                usage = stream.get_final_message().usage
+        except BaseException as e:
+            cls.log_ai_call(request_type, model, user_id, conversation_id, prompt=prompt, response=''.join(parts),
+                            success=False, error_message=str(e) or type(e).__name__,
+                            latency_ms=(time.time() - start_time) * 1000)
+            raise
+
+        cls.log_ai_call(request_type, model, user_id, conversation_id, prompt=prompt, response=''.join(parts).strip(),
+                        latency_ms=(time.time() - start_time) * 1000,
+                        input_tokens=usage.input_tokens, output_tokens=usage.output_tokens,
+                        cache_read_input_tokens=usage.cache_read_input_tokens,
+                        cache_creation_input_tokens=usage.cache_creation_input_tokens)
+
+    @staticmethod
+    def sse_response(chunks: Iterator[str]) -> Response:
+        """Send text chunks as Server-Sent Events: ``data: {"text": ...}`` frames, then ``data: [DONE]``.
+
+        Errors after the first byte cannot change the status code, so they
+        are sent as a final ``{"error": ...}`` frame.
+        """
+        def frames() -> Iterator[bytes]:
+            try:
+                for chunk in chunks:
+                    yield b'data: ' + orjson.dumps({'text': chunk}) + b'\n\n'
+            except Exception as e:
+                yield b'data: ' + orjson.dumps({'error': str(e)}) + b'\n\n'
+                return
+            yield b'data: [DONE]\n\n'
+
+        response = Response(stream_with_context(frames()), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        # Stop nginx buffering the stream so tokens reach the browser as they arrive
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+
+    @classmethod
+    async def _acomplete(cls, request_type: str, prompt: str, model: str = 'claude-sonnet',
+                         user_id: Optional[UUID] = None, conversation_id: Optional[UUID] = None,
+                         system: Optional[List[Dict[str, Any]]] = None) -> str:
+        """Async _complete for the background loop (log_ai_call only queues, so it never blocks the loop)."""
+        start_time = time.time()
+        try:
+            response = await cls.next_async_anthropic_client().messages.create(
+                model=_MODEL_MAPPING.get(model, _DEFAULT_API_MODEL),
+                max_tokens=cls.DEFAULT_MAX_TOKENS,
+                system=system or anthropic.NOT_GIVEN,
+                messages=[{"role": "user", "content": prompt}]
+            )
+        except Exception as e:
+            cls.log_ai_call(request_type, model, user_id, conversation_id, prompt=prompt, success=False,
+                            error_message=str(e), latency_ms=(time.time() - start_time) * 1000)
+            raise
+
+        text = response.content[0].text.strip()
+        usage = response.usage
+        cls.log_ai_call(request_type, model, user_id, conversation_id, prompt=prompt, response=text,
+                        latency_ms=(time.time() - start_time) * 1000,
+                        input_tokens=usage.input_tokens, output_tokens=usage.output_tokens,
+                        cache_read_input_tokens=usage.cache_read_input_tokens,
+                        cache_creation_input_tokens=usage.cache_creation_input_tokens)
+        return text
+
+    # Token budget for a copy request's cached system blocks (voice profile + reference material)
+    COPY_SYSTEM_TOKENS = 6000
+
+    @classmethod
+    def _voice_profile(cls, persona_id: UUID, platform: str) -> str:
+        """Get the persona's cached voice profile and sample posts plus the platform guide.
+
+        Both texts are precomputed on the persona row (see scripts.db), so
+        this is one primary-key lookup; personas saved before the cache
+        columns existed are built on the fly until their next save.
+        """
+        with get_session() as session:
+            persona = session.query(
+                Persona.voice_profile_cached, Persona.samples_cached
+            ).filter(Persona.id == persona_id).first()
+            if not persona:
+                raise ValueError(f"Persona not found: {persona_id}")
+            voice_profile = persona.voice_profile_cached
+            if voice_profile is None:
+                voice_profile = build_voice_profile(session.get(Persona, persona_id))
+
+        samples = f"\n\nRecent posts:\n{persona.samples_cached}" if persona.samples_cached else ''
+        return _COPY_SYSTEM_TEMPLATES.get(platform, _DEFAULT_COPY_SYSTEM_TEMPLATE).substitute(
+            voice_profile=voice_profile, samples=samples)
+
+    @staticmethod
+    def _copy_cache_key(system: List[Dict[str, Any]], request: str) -> str:
+        """Key a copy request by its exact system prompt and its case/whitespace-normalized request.
+
+        The system text already covers persona edits (through the cached
+        voice profile), platform and context, so a changed persona never
+        serves stale copy.
+        """
+        digest = hashlib.sha256()
+        for block in system:
+            digest.update(block['text'].encode())
+            digest.update(b'\0')
+        digest.update(_WHITESPACE_RE.sub(' ', request).strip().lower().encode())
+        return digest.hexdigest()
+
+    @classmethod
+    def _cached_copy(cls, cache_key: str, request: str, user_id: Optional[UUID],
+                     conversation_id: Optional[UUID]) -> Optional[str]:
+        """Get previously generated copy for a request, logging the hit."""
+        text = cls._copy_cache.get(cache_key)
+        if text is not None:
+            cls.log_ai_call('generate_copy', 'claude-sonnet', user_id, conversation_id, prompt=request,
+                            response=text, latency_ms=0.0, input_tokens=0, output_tokens=0, cache_hit=True)
+        return text
+
+    @classmethod
+    def generate_copy(cls, persona_id: UUID, platform: str, request: str, context_text: str = '',
+                      user_id: Optional[UUID] = None, conversation_id: Optional[UUID] = None) -> str:
+        """Write a post in a persona's voice, drawing on transcript context.
+
+        The voice profile and the reference material go in separate cached
+        system blocks: repeat turns for the same persona (and the same
+        context) hit the prompt cache, and only the per-turn request is
+        sent uncached. A repeat of the same request skips the API call.
+        """
+        system = cls._copy_system(persona_id, platform, context_text)
+        cache_key = cls._copy_cache_key(system, request)
+        text = cls._cached_copy(cache_key, request, user_id, conversation_id)
+        if text is None:
+            text = cls._complete('generate_copy', request, user_id=user_id, conversation_id=conversation_id,
+                                 system=system)
+            cls._copy_cache.set(cache_key, text)
+        return text
+
+    @classmethod
+    def _copy_system(cls, persona_id: UUID, platform: str, context_text: str) -> List[Dict[str, Any]]:
+        """Cached system blocks for a copy request: voice profile, then as much reference material as fits.
+
+        Reference material gets whatever is left of COPY_SYSTEM_TOKENS after
+        the voice profile, trimmed at entry boundaries.
+        """
+        voice_profile = cls._voice_profile(persona_id, platform)
+        system = [cls._cached_block(voice_profile)]
+        context_text = _trim_to_tokens(context_text, cls.COPY_SYSTEM_TOKENS - count_tokens(voice_profile))
+        if context_text:
+            system.append(cls._cached_block(f"REFERENCE MATERIAL:\n{context_text}"))
+        return system
+
+    @classmethod
+    def stream_copy(cls, persona_id: UUID, platform: str, request: str, context_text: str = '',
+                    user_id: Optional[UUID] = None, conversation_id: Optional[UUID] = None) -> Response:
+        """generate_copy as an SSE response, so the post renders token by token.
+
+        Cached copy is sent as a single frame; a stream that completes is
+        cached for the next repeat.
+        """
+        system = cls._copy_system(persona_id, platform, context_text)
+        cache_key = cls._copy_cache_key(system, request)
+        text = cls._cached_copy(cache_key, request, user_id, conversation_id)
+        if text is not None:
+            return cls.sse_response(iter([text]))
+
+        def chunks() -> Iterator[str]:
+            parts = []
+            for chunk in cls._stream_complete('generate_copy', request, user_id=user_id,
+                                              conversation_id=conversation_id, system=system):
+                parts.append(chunk)
+                yield chunk
+            cls._copy_cache.set(cache_key, ''.join(parts).strip())
+
+        return cls.sse_response(chunks())
+
+    @classmethod
+    def generate_copy_batch(cls, requests: List[Dict[str, Any]], user_id: Optional[UUID] = None) -> List[Dict[str, Any]]:
+        """Run several generate_copy requests concurrently; returns {'text': ...} or {'error': ...} per request.
+
+        Each request is a dict of generate_copy's arguments (persona_id,
+        platform, request, context_text). Prompts are built here, then all
+        API calls are awaited together on the background loop, so N posts
+        take about as long as the slowest one rather than the sum. Requests
+        with cached copy are answered without an API call.
+        """
+        results: List[Dict[str, Any]] = [{} for _ in requests]
+        pending = []
+        for index, item in enumerate(requests):
+            system = cls._copy_system(item['persona_id'], item['platform'], item.get('context_text', ''))
+            cache_key = cls._copy_cache_key(system, item['request'])
+            text = cls._cached_copy(cache_key, item['request'], user_id, None)
+            if text is not None:
+                results[index] = {'text': text}
+            else:
+                pending.append((index, item['request'], system, cache_key))
+
+        async def gather():
+            return await asyncio.gather(*(
+                cls._acomplete('generate_copy', request, user_id=user_id, system=system)
+                for _, request, system, _ in pending
+            ), return_exceptions=True)
+
+        if pending:
+            completions = asyncio.run_coroutine_threadsafe(gather(), cls._get_event_loop()).result()
+            for (index, _, _, cache_key), result in zip(pending, completions):
+                if isinstance(result, Exception):
+                    results[index] = {'error': str(result)}
+                else:
+                    cls._copy_cache.set(cache_key, result)
+                    results[index] = {'text': result}
+        return results
+
+    @classmethod
+    def _analyze_video(cls, request_type: str, prompt: str, user_id: Optional[UUID]) -> Dict[str, Any]:
+        """Run a JSON-returning video analysis prompt, cached per prompt hash."""
+        cache_key = (request_type, hashlib.sha256(prompt.encode()).hexdigest())
+        cached = cls._video_analysis_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        response_text = cls._complete(request_type, prompt, user_id=user_id)
+        result = _extract_json_object(response_text)
+        if result is None:
+            raise ValueError("AI response did not contain JSON")
+        cls._video_analysis_cache.set(cache_key, result)
+        return result
+
+    @classmethod
+    def identify_speakers(cls, video_id: UUID, user_id: Optional[UUID] = None) -> Dict[str, Any]:
+        """Ask Claude who is speaking in a video, from its opening transcript segments."""
+        segments = TranscriptService.get_opening_segments(video_id)
+        if not segments:
+            raise ValueError(f"No transcript for video: {video_id}")
+
+        transcript = '\n'.join(f"[{s['start_time']:.1f}s] {s['text']}" for s in segments)
+        prompt = (
+            "Identify the distinct speakers in this video transcript excerpt. "
+            "Respond with JSON only: {\"speakers\": [{\"name\": \"...\", \"role\": \"...\"}]}. "
+            "Use \"Unknown\" when a name cannot be inferred.\n\n"
+            f"Transcript:\n{transcript}"
+        )
+        return cls._analyze_video('identify_speakers', prompt, user_id)
+
+    @classmethod
+    def autofill_video(cls, video_id: UUID, user_id: Optional[UUID] = None) -> Dict[str, Any]:
+        """Ask Claude to suggest a video's speaker, event name and description from its transcript."""
+        transcript_text = _WHITESPACE_RE.sub(' ', TranscriptService.get_transcript_text(video_id)).strip()
+        if not transcript_text:
+            raise ValueError(f"No transcript for video: {video_id}")
+
+        prompt = (
+            "From this video transcript, suggest metadata for the video. "
+            "Respond with JSON only: {\"speaker\": \"...\", \"event_name\": \"...\", "
+            "\"event_date\": \"YYYY-MM-DD or null\", \"description\": \"...\"}.\n\n"
+            f"Transcript:\n{transcript_text}"
+        )
+        return cls._analyze_video('autofill_video', prompt, user_id)
+
+    @classmethod
+    def submit_identify_speakers(cls, video_id: UUID, user_id: Optional[UUID] = None) -> str:
+        """Queue identify_speakers in the background; poll JobService.get_status with the returned id and user."""
+        return JobService.submit(user_id, cls.identify_speakers, video_id, user_id)
+
+    @classmethod
+    def submit_autofill_video(cls, video_id: UUID, user_id: Optional[UUID] = None) -> str:
+        """Queue autofill_video in the background; poll JobService.get_status with the returned id and user."""
+        return JobService.submit(user_id, cls.autofill_video, video_id, user_id)
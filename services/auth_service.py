@@ -1,6 +1,234 @@
-"""Auth Service - Stub Implementation"""
+"""
+Authentication Service
+
+Request-level identity helpers for the Internal Platform API.
+"""
+
+import hashlib
+import hmac
+import re
+import secrets
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from flask import g, session
+from sqlalchemy import event, func, or_, text, update
+from sqlalchemy.orm import Session
+
+from scripts.db import DatabaseSession, User, get_session
+from services.cache_service import TTLCache
+
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# Accounts created before Argon2 store an unsalted hex SHA-256; they are rehashed on next login
+_LEGACY_SHA256_RE = re.compile(r'^[0-9a-f]{64}$')
+
+# Hot path for comment authors and mentions: skip ORM compilation and hydration
+_USER_NAME_SQL = text("SELECT name FROM users WHERE id = :id")
 
 
 class AuthService:
-    """Stub implementation for Auth Service."""
-    pass
\ No newline at end of file
+    """Service for resolving and validating the current user."""
+
+    # Argon2id parameters; raise time/memory cost as hardware allows
+    _password_hasher = PasswordHasher(time_cost=2, memory_cost=64 * 1024, parallelism=2)
+
+    # Typeahead searches repeat the same prefixes within seconds
+    USER_SEARCH_CACHE_TTL = 60
+    _user_search_cache = TTLCache(ttl_seconds=USER_SEARCH_CACHE_TTL)
+
+    @staticmethod
+    def parse_uuid(value: Any) -> Optional[UUID]:
+        """Parse a UUID string, returning None when it is malformed.
+
+        Handlers call this before opening a DatabaseSession so bad ids are
+        rejected with a 400 without checking a connection out of the pool.
+        """
+        if isinstance(value, UUID):
+            return value
+        try:
+            return UUID(value)
+        except (ValueError, AttributeError, TypeError):
+            return None
+
+    @classmethod
+    def current_user_id(cls) -> Optional[UUID]:
+        """Get the logged-in user's id, parsed once per request and kept on flask.g."""
+        if 'current_user_id' not in g:
+            g.current_user_id = cls.parse_uuid(session.get('user_id'))
+        return g.current_user_id
+
+    @classmethod
+    def current_user(cls) -> Optional[Dict[str, Any]]:
+        """Get the logged-in user's id/name/email, loaded once per request and kept on flask.g."""
+        if 'current_user' not in g:
+            user_id = cls.current_user_id()
+            g.current_user = None
+            if user_id:
+                with get_session() as db_session:
+                    user = db_session.query(User.id, User.name, User.email).filter(User.id == user_id).first()
+                    if user:
+                        g.current_user = {'id': user.id, 'name': user.name, 'email': user.email}
+        return g.current_user
+
+    @staticmethod
+    def is_valid_email(email: str) -> bool:
+        """Check an address has a plausible user@domain.tld shape."""
+        return bool(_EMAIL_RE.match(email or ''))
+
+    @classmethod
+    def hash_password(cls, password: str) -> str:
+        """Hash a password with Argon2id."""
+        return cls._password_hasher.hash(password)
+
+    @classmethod
+    def verify_password(cls, password_hash: str, password: str) -> bool:
+        """Check a password against a stored Argon2id hash, or a legacy SHA-256 hex digest.
+
+        The legacy digest is compared with hmac.compare_digest so the
+        comparison time doesn't depend on how many leading characters match.
+        """
+        if _LEGACY_SHA256_RE.match(password_hash or ''):
+            return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), password_hash)
+        try:
+            return cls._password_hasher.verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    @classmethod
+    def _needs_rehash(cls, password_hash: str) -> bool:
+        """True for legacy SHA-256 hashes and Argon2 hashes made with older parameters."""
+        return bool(_LEGACY_SHA256_RE.match(password_hash)) or cls._password_hasher.check_needs_rehash(password_hash)
+
+    # Verified against when the email is unknown, so a miss takes as long as a wrong password
+    _dummy_hash: Optional[str] = None
+
+    @classmethod
+    def authenticate(cls, email: str, password: str) -> Optional[Dict[str, Any]]:
+        """Get the active user's id/name/email for a correct email and password, else None.
+
+        Emails match case-insensitively (older accounts may be stored with
+        capitals). A legacy or outdated hash is replaced with a fresh
+        Argon2id hash once the password has been verified.
+        """
+        email = (email or '').strip().lower()
+        with get_session() as db_session:
+            user = db_session.query(User.id, User.name, User.email, User.password_hash).filter(
+                func.lower(User.email) == email, User.is_active == 1
+            ).first()
+
+        if user is None:
+            if cls._dummy_hash is None:
+                cls._dummy_hash = cls.hash_password(secrets.token_urlsafe(16))
+            cls.verify_password(cls._dummy_hash, password)
+            return None
+        if not cls.verify_password(user.password_hash, password):
+            return None
+
+        if cls._needs_rehash(user.password_hash):
+            with DatabaseSession() as db_session:
+                db_session.execute(
+                    update(User).where(User.id == user.id).values(password_hash=cls.hash_password(password))
+                )
+        return {'id': user.id, 'name': user.name, 'email': user.email}
+
+    @classmethod
+    def invite_user(cls, email: str, name: str) -> Dict[str, Any]:
+        """Create an account for an invited team member with a one-time temporary password."""
+        email = (email or '').strip().lower()
+        if not cls.is_valid_email(email):
+            raise ValueError(f"Invalid email address: {email}")
+
+        temp_password = secrets.token_urlsafe(12)
+        with DatabaseSession(expire_on_commit=False) as db_session:
+            if db_session.query(db_session.query(User.id).filter(func.lower(User.email) == email).exists()).scalar():
+                raise ValueError(f"User already exists: {email}")
+
+            user = User(email=email, name=(name or '').strip() or email.split('@')[0],
+                        password_hash=cls.hash_password(temp_password))
+            db_session.add(user)
+            db_session.commit()
+
+            return {'id': str(user.id), 'email': user.email, 'name': user.name, 'temp_password': temp_password}
+
+    # Name shown next to the account in authenticator apps
+    TOTP_ISSUER = 'MV Internal'
+
+    @classmethod
+    def start_two_factor_setup(cls, user_id: UUID, email: str) -> Dict[str, str]:
+        """Generate a pending TOTP secret for a user and the QR code their authenticator app scans.
+
+        The secret is held in temp_2fa_secret until the first code is
+        confirmed. The QR code is an SVG data URI from segno: text output,
+        so no PIL rasterisation on the request path.
+        """
+        # Only 2FA setup needs these; keep them out of every worker's import
+        import pyotp
+        import segno
+
+        secret = pyotp.random_base32()
+        with DatabaseSession() as db_session:
+            db_session.execute(update(User).where(User.id == user_id).values(temp_2fa_secret=secret))
+
+        uri = pyotp.TOTP(secret).provisioning_uri(name=email, issuer_name=cls.TOTP_ISSUER)
+        qr_code = segno.make(uri, error='m').svg_data_uri(scale=6)
+        return {'secret': secret, 'qr_code': qr_code}
+
+    @staticmethod
+    def get_user_name(db_session: Session, user_id: UUID) -> Optional[str]:
+        """Get a user's name with a single scalar SELECT on the caller's session."""
+        return db_session.execute(_USER_NAME_SQL, {'id': user_id}).scalar()
+
+    @staticmethod
+    def _escape_like(value: str) -> str:
+        """Escape LIKE wildcards so user input is matched literally."""
+        return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+    @classmethod
+    def search_users(cls, query: str, exclude_user_id: Optional[UUID] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """Search active users, cached per (query, requesting user) for typeahead bursts."""
+        key = (query.strip().lower(), exclude_user_id, limit)
+        return cls._user_search_cache.get_or_set(
+            key, lambda: cls._search_users_uncached(key[0], exclude_user_id, limit)
+        )
+
+    @classmethod
+    def _search_users_uncached(cls, query: str, exclude_user_id: Optional[UUID], limit: int) -> List[Dict[str, Any]]:
+        """Search active users by name or email for mention/invite autocomplete.
+
+        Prefix matches are served first from the lower(col) text_pattern_ops
+        btree indexes; the trigram substring search only runs to fill the
+        remaining slots for queries long enough to benefit from it.
+        """
+        escaped = cls._escape_like(query.lower())
+
+        with get_session() as db_session:
+            base_query = db_session.query(User.id, User.name, User.email).filter(User.is_active == 1)
+            if exclude_user_id:
+                base_query = base_query.filter(User.id != exclude_user_id)
+
+            prefix = f"{escaped}%"
+            users = base_query.filter(or_(
+                func.lower(User.name).like(prefix, escape='\\'),
+                func.lower(User.email).like(prefix, escape='\\')
+            )).order_by(User.name).limit(limit).all()
+
+            if len(users) < limit and len(query) >= 3:
+                pattern = f"%{escaped}%"
+                substring_query = base_query.filter(
+                    or_(User.name.ilike(pattern, escape='\\'), User.email.ilike(pattern, escape='\\'))
+                )
+                if users:
+                    substring_query = substring_query.filter(User.id.notin_([u.id for u in users]))
+                users += substring_query.order_by(User.name).limit(limit - len(users)).all()
+
+            return [{'id': str(u.id), 'name': u.name, 'email': u.email} for u in users]
+
+
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+def _invalidate_user_search_cache(mapper, connection, target):
+    """Drop cached search results when any user row changes."""
+    AuthService._user_search_cache.clear()
@@ -0,0 +1,300 @@
+"""
+Clip Service
+
+Cuts downloadable clips out of source videos with ffmpeg, keeping local
+caches of the source files and the rendered clips.
+"""
+
+import bisect
+import fcntl
+import heapq
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import unicodedata
+from pathlib import Path
+from fractions import Fraction
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+from uuid import UUID
+
+from flask import Response, current_app, send_file
+
+from scripts.config_loader import get_config
+from scripts.db import Video, get_session
+from services.cache_service import TTLCache
+from services.storage_service import StorageService
+
+# Resolved once at import instead of walking PATH on every clip
+FFMPEG_PATH = shutil.which('ffmpeg') or '/usr/local/bin/ffmpeg'
+FFPROBE_PATH = shutil.which('ffprobe') or '/usr/local/bin/ffprobe'
+
+
+class ClipService:
+    """Service for extracting video clips."""
+
+    # Rendered clips kept on local disk; the directory is only swept every N renders
+    MAX_CACHED_CLIPS = 50
+    EVICTION_INTERVAL = 25
+    FFMPEG_TIMEOUT_SECONDS = 600
+    # Anything smaller than this from a stream copy is treated as a failed cut
+    MIN_CLIP_BYTES = 1024
+
+    # Codecs a clip can be stream-copied in without re-encoding
+    COPYABLE_VIDEO = ('h264', 'yuv420p')
+    COPYABLE_AUDIO = ('aac', None)
+    # Frame length assumed when a source doesn't report its frame rate
+    DEFAULT_FRAME_SECONDS = 1 / 30
+
+    # ffprobe results per (cached file, mtime)
+    _probe_cache = TTLCache(ttl_seconds=24 * 3600)
+
+    _renders = itertools.count(1)
+
+    @staticmethod
+    def _cache_dir(name: str) -> Path:
+        """Get (creating) a cache directory under the configured temp dir."""
+        path = get_config().temp_dir / name
+        path.mkdir(parents=True, exist_ok=True)
+        return path
+
+    @staticmethod
+    def _is_cached(path: Path) -> bool:
+        """True when a complete cached source exists (partial downloads never take this name)."""
+        return path.exists() and path.stat().st_size >= 1000
+
+    @classmethod
+    def _cached_source(cls, video_id: UUID, bucket: str, key: str) -> Path:
+        """Get the local copy of a source video, downloading it if missing.
+
+        One download per video across every worker: the download runs under
+        an flock on a per-video lock file, and callers that waited re-check
+        the cache once they hold the lock. Each download goes to its own
+        temp file that is renamed into place, so a half-written file is
+        never mistaken for a cached one.
+        """
+        cache_dir = cls._cache_dir('video_cache')
+        cached_video = cache_dir / f"{video_id}.mp4"
+        if cls._is_cached(cached_video):
+            return cached_video
+
+        with open(cache_dir / f"{video_id}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            if not cls._is_cached(cached_video):
+                with tempfile.NamedTemporaryFile(dir=cache_dir, prefix=f"{video_id}.", suffix='.part',
+                                                 delete=False) as part_file:
+                    part_path = Path(part_file.name)
+                try:
+                    StorageService.download_file(bucket, key, str(part_path))
+                    os.replace(part_path, cached_video)
+                finally:
+                    part_path.unlink(missing_ok=True)
+        return cached_video
+
+    @classmethod
+    def _evict_old_clips(cls, clips_dir: Path) -> None:
+        """Drop the oldest rendered clips beyond MAX_CACHED_CLIPS, sweeping every EVICTION_INTERVAL renders."""
+        if next(cls._renders) % cls.EVICTION_INTERVAL:
+            return
+
+        with os.scandir(clips_dir) as entries:
+            clips = [(entry.stat().st_mtime, entry.path) for entry in entries
+                     if entry.is_file() and entry.name.endswith('.mp4')]
+        excess = len(clips) - cls.MAX_CACHED_CLIPS
+        if excess > 0:
+            for _, path in heapq.nsmallest(excess, clips):
+                Path(path).unlink(missing_ok=True)
+
+    @classmethod
+    def _probe_codecs(cls, path: Path) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """Get {'video': (codec, pix_fmt), 'audio': (codec, None)} for a file, memoized per mtime."""
+        cache_key = (str(path), path.stat().st_mtime)
+        codecs = cls._probe_cache.get(cache_key)
+        if codecs is None:
+            result = subprocess.run([
+                FFPROBE_PATH, '-v', 'quiet', '-print_format', 'json',
+                '-show_entries', 'stream=codec_type,codec_name,pix_fmt', str(path)
+            ], capture_output=True, text=True, timeout=60)
+            codecs = {}
+            if result.returncode == 0:
+                for stream in json.loads(result.stdout or '{}').get('streams', []):
+                    kind = stream.get('codec_type')
+                    if kind == 'video' and 'video' not in codecs:
+                        codecs['video'] = (stream.get('codec_name'), stream.get('pix_fmt'))
+                    elif kind == 'audio' and 'audio' not in codecs:
+                        codecs['audio'] = (stream.get('codec_name'), None)
+            cls._probe_cache.set(cache_key, codecs)
+        return codecs
+
+    @classmethod
+    def _probe_keyframes(cls, path: Path) -> Tuple[List[float], float]:
+        """Get (sorted keyframe times, frame length in seconds) for a file, memoized per mtime.
+
+        ``-skip_frame nokey`` makes the decoder hand back only keyframes, so
+        this reads the file once without decoding every frame.
+        """
+        cache_key = ('keyframes', str(path), path.stat().st_mtime)
+        keyframes = cls._probe_cache.get(cache_key)
+        if keyframes is None:
+            result = subprocess.run([
+                FFPROBE_PATH, '-v', 'quiet', '-print_format', 'json',
+                '-select_streams', 'v:0', '-skip_frame', 'nokey',
+                '-show_entries', 'frame=pts_time:stream=avg_frame_rate', str(path)
+            ], capture_output=True, text=True, timeout=cls.FFMPEG_TIMEOUT_SECONDS)
+            times, frame_seconds = [], cls.DEFAULT_FRAME_SECONDS
+            if result.returncode == 0:
+                probe = json.loads(result.stdout or '{}')
+                times = sorted(float(frame['pts_time']) for frame in probe.get('frames', []) if 'pts_time' in frame)
+                for stream in probe.get('streams', []):
+                    try:
+                        frame_rate = Fraction(stream.get('avg_frame_rate', '0/0'))
+                    except (ValueError, ZeroDivisionError):
+                        continue
+                    if frame_rate > 0:
+                        frame_seconds = float(1 / frame_rate)
+            keyframes = (times, frame_seconds)
+            cls._probe_cache.set(cache_key, keyframes)
+        return keyframes
+
+    @classmethod
+    def _starts_on_keyframe(cls, path: Path, start_time: float) -> bool:
+        """True when start_time is within one frame of a keyframe, so a copied cut starts where asked."""
+        times, frame_seconds = cls._probe_keyframes(path)
+        index = bisect.bisect_left(times, start_time)
+        return any(abs(times[i] - start_time) <= frame_seconds for i in (index - 1, index) if 0 <= i < len(times))
+
+    @classmethod
+    def _can_stream_copy(cls, path: Path, start_time: float) -> bool:
+        """True when the source is already H.264/yuv420p (+AAC) and the cut starts on a keyframe.
+
+        A stream copy can only start at a keyframe; anywhere else it would
+        begin up to a GOP early with footage the user didn't select.
+        """
+        codecs = cls._probe_codecs(path)
+        if codecs.get('video') != cls.COPYABLE_VIDEO or codecs.get('audio', cls.COPYABLE_AUDIO) != cls.COPYABLE_AUDIO:
+            return False
+        return cls._starts_on_keyframe(path, start_time)
+
+    @classmethod
+    def _run_ffmpeg(cls, source: Path, start_time: float, duration: float,
+                    output_path: Path, codec_args: Optional[List[str]]) -> bool:
+        """Cut one clip; ``codec_args=None`` stream-copies. Returns True on a usable output."""
+        if codec_args is None:
+            codec_args = ['-c', 'copy', '-avoid_negative_ts', 'make_zero']
+        cmd = [
+            FFMPEG_PATH, '-y',
+            '-ss', str(start_time),
+            '-i', str(source),
+            '-t', str(duration),
+            *codec_args,
+            '-movflags', '+faststart',
+            '-f', 'mp4',
+            str(output_path)
+        ]
+        result = subprocess.run(cmd, capture_output=True, timeout=cls.FFMPEG_TIMEOUT_SECONDS)
+        return result.returncode == 0 and output_path.exists() and output_path.stat().st_size >= cls.MIN_CLIP_BYTES
+
+    @classmethod
+    def _encode(cls, source: Path, start_time: float, duration: float, output_path: Path) -> None:
+        """Re-encode a clip, dropping from superfast to ultrafast if the first pass times out."""
+        for preset in ('superfast', 'ultrafast'):
+            codec_args = ['-c:v', 'libx264', '-preset', preset, '-crf', '18', '-c:a', 'aac', '-b:a', '192k']
+            try:
+                if cls._run_ffmpeg(source, start_time, duration, output_path, codec_args):
+                    return
+                raise RuntimeError(f"ffmpeg failed to encode clip from {source.name}")
+            except subprocess.TimeoutExpired:
+                continue
+        raise RuntimeError(f"ffmpeg timed out encoding clip from {source.name}")
+
+    @classmethod
+    def extract_clip(cls, video_id: UUID, start_time: float, end_time: float) -> Path:
+        """Render [start_time, end_time] of a video to an MP4 and return its path.
+
+        ``-ss`` is given before ``-i`` so ffmpeg seeks in the container to
+        the nearest keyframe instead of decoding and discarding everything
+        up to start_time; when transcoding, input seeking is still frame
+        accurate.
+
+        Cuts from H.264/AAC sources that start on a keyframe are
+        stream-copied (no encode); anything else, or a copy that fails or
+        times out, falls back to a libx264 encode.
+        """
+        duration = end_time - start_time
+        if duration <= 0:
+            raise ValueError("end_time must be after start_time")
+
+        clips_dir = cls._cache_dir('clips')
+        # Exact to the millisecond, so nearby requests never share a cached clip
+        output_path = clips_dir / f"{video_id}_{round(start_time * 1000)}_{round(end_time * 1000)}.mp4"
+
+        # Same clip rendered before: serve it, and touch it so eviction sees it as recent
+        if output_path.exists() and output_path.stat().st_size > cls.MIN_CLIP_BYTES:
+            output_path.touch()
+            return output_path
+
+        with get_session() as session:
+            video = session.query(Video.s3_bucket, Video.s3_key).filter(Video.id == video_id).first()
+        if not video:
+            raise ValueError(f"Video not found: {video_id}")
+
+        cached_video = cls._cached_source(video_id, video.s3_bucket, video.s3_key)
+
+        # Render under a unique name and rename only a validated clip into place, so a failed or
+        # in-progress render is never served from the cache
+        with tempfile.NamedTemporaryFile(dir=clips_dir, prefix=f"{video_id}.", suffix='.part', delete=False) as part_file:
+            part_path = Path(part_file.name)
+        try:
+            copied = False
+            if cls._can_stream_copy(cached_video, start_time):
+                try:
+                    copied = cls._run_ffmpeg(cached_video, start_time, duration, part_path, None)
+                except subprocess.TimeoutExpired:
+                    copied = False
+            if not copied:
+                cls._encode(cached_video, start_time, duration, part_path)
+            os.replace(part_path, output_path)
+        finally:
+            part_path.unlink(missing_ok=True)
+
+        cls._evict_old_clips(clips_dir)
+        return output_path
+
+    @staticmethod
+    def _filename_params(download_name: str) -> Dict[str, str]:
+        """Content-Disposition filename parameters, built the way send_file builds them.
+
+        Control characters (CR/LF would make the header invalid) are dropped;
+        non-ASCII names get an ASCII ``filename`` plus an RFC 5987
+        ``filename*``. Werkzeug quotes and escapes the values.
+        """
+        name = ''.join(ch for ch in download_name if unicodedata.category(ch) != 'Cc') or 'clip.mp4'
+        try:
+            name.encode('ascii')
+        except UnicodeEncodeError:
+            simple = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii')
+            return {'filename': simple, 'filename*': f"UTF-8''{quote(name, safe='!#$&+-.^_`|~')}"}
+        return {'filename': name}
+
+    @classmethod
+    def clip_response(cls, output_path: Path, download_name: str) -> Response:
+        """Build the download response for a rendered clip.
+
+        Behind nginx, set ``CLIPS_ACCEL_REDIRECT_PREFIX`` (an ``internal``
+        location aliased to the clips cache dir, e.g. ``/protected_clips/``)
+        and nginx serves the file with sendfile while the worker returns
+        immediately. Otherwise Flask streams it with Range/If-Modified-Since
+        support.
+        """
+        accel_prefix = current_app.config.get('CLIPS_ACCEL_REDIRECT_PREFIX')
+        if accel_prefix:
+            response = Response(mimetype='video/mp4')
+            response.headers['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{output_path.name}"
+            response.headers.set('Content-Disposition', 'attachment', **cls._filename_params(download_name))
+            return response
+
+        return send_file(str(output_path), mimetype='video/mp4', as_attachment=True,
+                         download_name=download_name, conditional=True)
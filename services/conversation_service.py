@@ -0,0 +1,668 @@
+"""
+Conversation Service
+
+Conversation, participant and clip-comment queries for the chat API.
+"""
+
+import hashlib
+import re
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from flask import Response, current_app, g, has_app_context, request
+from sqlalchemy import and_, bindparam, delete, desc, func, insert, or_, text, update
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Query, Session, joinedload, raiseload
+
+from scripts.db import (
+    ChatMessage, ChatParticipant, ClipComment, Conversation, DatabaseSession, Project, User, get_session
+)
+from services.auth_service import AuthService
+from services.cache_service import TTLCache
+from services.response_service import ResponseService
+
+# @mentions in comments, e.g. "@jane" or "@mv-video"
+_MENTION_RE = re.compile(r'@(\w+(?:-\w+)*)')
+
+# Invite in one round-trip: access check, invitee lookup, upsert and
+# is_collaborative flag; conflicts on (conversation_id, user_id) are no-ops
+_INVITE_SQL = text("""
+    WITH access AS (
+        SELECT 1 FROM conversations c
+        WHERE c.id = :conversation_id
+          AND (c.user_id = :inviter_id OR EXISTS (
+              SELECT 1 FROM chat_participants p
+              WHERE p.conversation_id = :conversation_id AND p.user_id = :inviter_id
+          ))
+    ),
+    invitee AS (
+        SELECT id, name, email FROM users WHERE id = :user_id AND is_active = 1
+    ),
+    ins AS (
+        INSERT INTO chat_participants (id, conversation_id, user_id, role, invited_by, joined_at)
+        SELECT :participant_id, :conversation_id, :user_id, :role, :inviter_id, :joined_at
+        WHERE EXISTS (SELECT 1 FROM access) AND EXISTS (SELECT 1 FROM invitee)
+        ON CONFLICT (conversation_id, user_id) DO NOTHING
+        RETURNING id
+    ),
+    upd AS (
+        UPDATE conversations SET is_collaborative = 1
+        WHERE id = :conversation_id AND EXISTS (SELECT 1 FROM ins)
+    )
+    SELECT EXISTS (SELECT 1 FROM access) AS has_access,
+           i.id AS invitee_id, i.name AS invitee_name, i.email AS invitee_email,
+           EXISTS (SELECT 1 FROM ins) AS added
+    FROM (SELECT 1) AS one LEFT JOIN invitee i ON true
+""").bindparams(
+    bindparam('participant_id', type_=PG_UUID(as_uuid=True)),
+    bindparam('conversation_id', type_=PG_UUID(as_uuid=True)),
+    bindparam('inviter_id', type_=PG_UUID(as_uuid=True)),
+    bindparam('user_id', type_=PG_UUID(as_uuid=True))
+)
+
+
+def _strict_loading() -> list:
+    """Query options that turn unplanned lazy loads into errors in debug mode.
+
+    Every query here eager-loads what it serializes, so an unexpected lazy
+    load is an N+1 regression; production tolerates it, debug raises.
+    """
+    if has_app_context() and current_app.debug:
+        return [raiseload('*')]
+    return []
+
+
+def _exists(session: Session, query: Query) -> bool:
+    """Run ``SELECT EXISTS(query)``: one boolean back, no ORM row hydrated."""
+    return session.query(query.exists()).scalar()
+
+
+class ConversationService:
+    """Service for reading and updating chat conversations."""
+
+    # Rows fetched per round-trip when streaming conversation and message lists
+    CONVERSATION_STREAM_BATCH = 200
+
+    @classmethod
+    def list_conversations(cls, user_id: UUID) -> List[Dict[str, Any]]:
+        """List a user's conversations, most recently updated first."""
+        return list(cls.iter_conversations(user_id))
+
+    @classmethod
+    def iter_conversations(cls, user_id: UUID) -> Iterator[Dict[str, Any]]:
+        """Yield a user's conversations, most recently updated first, fetching rows in batches."""
+        with get_session() as session:
+            rows = session.query(
+                Conversation.id, Conversation.title, Conversation.project_id, Conversation.starred,
+                Conversation.preferred_model, Conversation.message_count, Conversation.created_at,
+                Conversation.updated_at
+            ).filter(
+                Conversation.user_id == user_id
+            ).order_by(desc(Conversation.updated_at)).yield_per(cls.CONVERSATION_STREAM_BATCH)
+
+            for c in rows:
+                yield {
+                    'id': str(c.id),
+                    'title': c.title,
+                    'project_id': str(c.project_id) if c.project_id else None,
+                    'starred': bool(c.starred),
+                    'preferred_model': c.preferred_model,
+                    'message_count': c.message_count,
+                    'created_at': c.created_at.isoformat() if c.created_at else None,
+                    'updated_at': c.updated_at.isoformat() if c.updated_at else None
+                }
+
+    @classmethod
+    def conversations_response(cls, user_id: UUID) -> Response:
+        """Stream ``{"conversations": [...]}``, so the first rows go out before the last are read."""
+        return ResponseService.stream_json('conversations', cls.iter_conversations(user_id))
+
+    @classmethod
+    def iter_messages(cls, conversation_id: UUID) -> Iterator[Dict[str, Any]]:
+        """Yield a conversation's messages, oldest first, fetching rows in batches."""
+        with get_session() as session:
+            rows = session.query(
+                ChatMessage.id, ChatMessage.user_id, ChatMessage.role, ChatMessage.content, ChatMessage.clips_json,
+                ChatMessage.attachments_json, ChatMessage.mentions, ChatMessage.model, ChatMessage.created_at
+            ).filter(
+                ChatMessage.conversation_id == conversation_id
+            ).order_by(ChatMessage.created_at, ChatMessage.id).yield_per(cls.CONVERSATION_STREAM_BATCH)
+
+            for m in rows:
+                yield {
+                    'id': str(m.id),
+                    'user_id': str(m.user_id) if m.user_id else None,
+                    'role': m.role,
+                    'content': m.content,
+                    'clips': m.clips_json or [],
+                    'attachments': m.attachments_json or [],
+                    'mentions': m.mentions or [],
+                    'model': m.model,
+                    'created_at': m.created_at.isoformat() if m.created_at else None
+                }
+
+    @classmethod
+    def conversation_response(cls, conversation_id: UUID, user_id: UUID) -> Optional[Response]:
+        """Stream a conversation's messages followed by its details; None if the user can't see it.
+
+        The access check and details are one query up front, so a 404 can
+        still be returned before streaming starts.
+        """
+        with get_session() as session:
+            conversation = session.query(
+                Conversation.id, Conversation.title, Conversation.project_id, Conversation.starred,
+                Conversation.is_collaborative, Conversation.preferred_model, Conversation.message_count,
+                Conversation.created_at, Conversation.updated_at
+            ).filter(cls._access_filter(conversation_id, user_id)).first()
+        if not conversation:
+            return None
+
+        details = {
+            'id': str(conversation.id),
+            'title': conversation.title,
+            'project_id': str(conversation.project_id) if conversation.project_id else None,
+            'starred': bool(conversation.starred),
+            'is_collaborative': bool(conversation.is_collaborative),
+            'preferred_model': conversation.preferred_model,
+            'message_count': conversation.message_count,
+            'created_at': conversation.created_at.isoformat() if conversation.created_at else None,
+            'updated_at': conversation.updated_at.isoformat() if conversation.updated_at else None
+        }
+        return ResponseService.stream_json('messages', cls.iter_messages(conversation_id),
+                                           extra={'conversation': details})
+
+    @classmethod
+    def list_projects(cls, user_id: UUID) -> List[Dict[str, Any]]:
+        """List a user's active projects, newest first, with how many of their chats have messages.
+
+        The counts come from one GROUP BY over conversations.message_count,
+        so no project's conversations (or their messages) are loaded.
+        """
+        with get_session() as session:
+            projects = session.query(
+                Project.id, Project.name, Project.description, Project.custom_instructions, Project.color,
+                Project.created_at, Project.updated_at
+            ).filter(
+                Project.user_id == user_id, Project.is_archived == 0
+            ).order_by(desc(Project.created_at)).all()
+
+            counts = dict(session.query(Conversation.project_id, func.count(Conversation.id)).filter(
+                Conversation.user_id == user_id,
+                Conversation.project_id.isnot(None),
+                Conversation.message_count > 0
+            ).group_by(Conversation.project_id).all())
+
+        return [
+            {
+                'id': str(p.id),
+                'name': p.name,
+                'description': p.description,
+                'custom_instructions': p.custom_instructions,
+                'color': p.color,
+                'conversation_count': counts.get(p.id, 0),
+                'created_at': p.created_at.isoformat() if p.created_at else None,
+                'updated_at': p.updated_at.isoformat() if p.updated_at else None
+            }
+            for p in projects
+        ]
+
+    @classmethod
+    def get_project(cls, project_id: UUID, user_id: UUID) -> Optional[Dict[str, Any]]:
+        """Get one of a user's projects with its conversations, most recently updated first.
+
+        Conversations come from a single column query that reads each chat's
+        message_count, so there is no per-conversation messages load. Returns
+        None if the project does not exist or is not the user's.
+        """
+        with get_session() as session:
+            project = session.query(
+                Project.id, Project.name, Project.description, Project.custom_instructions, Project.color,
+                Project.is_archived, Project.created_at, Project.updated_at
+            ).filter(Project.id == project_id, Project.user_id == user_id).first()
+            if not project:
+                return None
+
+            conversations = session.query(
+                Conversation.id, Conversation.title, Conversation.starred, Conversation.preferred_model,
+                Conversation.message_count, Conversation.created_at, Conversation.updated_at
+            ).filter(
+                Conversation.project_id == project_id, Conversation.user_id == user_id
+            ).order_by(desc(Conversation.updated_at)).all()
+
+        return {
+            'id': str(project.id),
+            'name': project.name,
+            'description': project.description,
+            'custom_instructions': project.custom_instructions,
+            'color': project.color,
+            'is_archived': bool(project.is_archived),
+            'created_at': project.created_at.isoformat() if project.created_at else None,
+            'updated_at': project.updated_at.isoformat() if project.updated_at else None,
+            'conversations': [
+                {
+                    'id': str(c.id),
+                    'title': c.title,
+                    'starred': bool(c.starred),
+                    'preferred_model': c.preferred_model,
+                    'message_count': c.message_count,
+                    'created_at': c.created_at.isoformat() if c.created_at else None,
+                    'updated_at': c.updated_at.isoformat() if c.updated_at else None
+                }
+                for c in conversations
+            ]
+        }
+
+    # Recent chats shown in the sidebar
+    SIDEBAR_CONVERSATIONS = 50
+
+    # Sidebars keyed by (user, version); a new version simply misses, old ones age out
+    SIDEBAR_CACHE_TTL = 300
+    _sidebar_cache = TTLCache(ttl_seconds=SIDEBAR_CACHE_TTL, max_entries=5_000)
+
+    @staticmethod
+    def _sidebar_version(session: Session, user_id: UUID) -> tuple:
+        """Latest updated_at and row counts of a user's projects and conversations.
+
+        Any create, edit or delete changes one of them, so this is a cheap
+        (index-only for conversations) validator for the cached sidebar.
+        """
+        conversations = session.query(func.max(Conversation.updated_at), func.count(Conversation.id)).filter(
+            Conversation.user_id == user_id
+        ).subquery()
+        projects = session.query(func.max(Project.updated_at), func.count(Project.id)).filter(
+            Project.user_id == user_id
+        ).subquery()
+        return tuple(session.query(conversations, projects).one())
+
+    @classmethod
+    def get_sidebar(cls, user_id: UUID) -> Tuple[Dict[str, Any], str]:
+        """Get (sidebar data, ETag), rebuilding the data only when the user's sidebar version changed."""
+        with get_session() as session:
+            version = cls._sidebar_version(session, user_id)
+        etag = 'sidebar-' + hashlib.sha1(repr((user_id, version)).encode()).hexdigest()[:16]
+        data = cls._sidebar_cache.get_or_set((user_id, version), lambda: cls.get_sidebar_data(user_id))
+        return data, etag
+
+    @classmethod
+    def current_sidebar(cls) -> Optional[Tuple[Dict[str, Any], str]]:
+        """Get the logged-in user's (sidebar data, ETag), fetched once per request and kept on flask.g.
+
+        Pages that render the sidebar in several fragments share one version
+        check instead of opening a session per fragment. None when logged out.
+        """
+        if 'sidebar' not in g:
+            user_id = AuthService.current_user_id()
+            g.sidebar = cls.get_sidebar(user_id) if user_id else None
+        return g.sidebar
+
+    @classmethod
+    def sidebar_response(cls, user_id: UUID) -> Response:
+        """JSON sidebar response with an ETag; answers 304 when the client's If-None-Match still matches."""
+        if user_id == AuthService.current_user_id():
+            data, etag = cls.current_sidebar()
+        else:
+            data, etag = cls.get_sidebar(user_id)
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = ResponseService.json_response(data)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
+    @classmethod
+    def get_sidebar_data(cls, user_id: UUID) -> Dict[str, Any]:
+        """Get the sidebar's projects (with non-empty chat counts) and recent conversations.
+
+        Counts come from a grouped outer join on conversations.message_count,
+        so neither projects' conversations nor conversations' messages are
+        loaded: two queries in total, whatever the user has.
+        """
+        with get_session() as session:
+            projects = session.query(
+                Project.id, Project.name, Project.color,
+                func.count(Conversation.id).filter(Conversation.message_count > 0).label('conversation_count')
+            ).outerjoin(
+                # Owner's chats only, matching list_projects; in the ON clause so empty projects still list
+                Conversation, and_(Conversation.project_id == Project.id, Conversation.user_id == user_id)
+            ).filter(
+                Project.user_id == user_id, Project.is_archived == 0
+            ).group_by(Project.id).order_by(desc(Project.created_at)).all()
+
+            conversations = session.query(
+                Conversation.id, Conversation.title, Conversation.project_id, Conversation.starred,
+                Conversation.message_count, Conversation.updated_at
+            ).filter(
+                Conversation.user_id == user_id
+            ).order_by(desc(Conversation.starred), desc(Conversation.updated_at)).limit(cls.SIDEBAR_CONVERSATIONS).all()
+
+            return {
+                'projects': [
+                    {'id': str(p.id), 'name': p.name, 'color': p.color, 'conversation_count': p.conversation_count}
+                    for p in projects
+                ],
+                'conversations': [
+                    {
+                        'id': str(c.id),
+                        'title': c.title,
+                        'project_id': str(c.project_id) if c.project_id else None,
+                        'starred': bool(c.starred),
+                        'message_count': c.message_count,
+                        'updated_at': c.updated_at.isoformat() if c.updated_at else None
+                    }
+                    for c in conversations
+                ]
+            }
+
+    @classmethod
+    def save_chat_turn(cls, conversation_id: UUID, user_id: Optional[UUID], user_content: str,
+                       assistant_content: str, model: Optional[str] = None, clips: Optional[list] = None,
+                       attachments: Optional[list] = None, mentions: Optional[list] = None,
+                       title: Optional[str] = None, sent_at: Optional[datetime] = None) -> Dict[str, Any]:
+        """Persist a user message and the assistant's reply in one transaction.
+
+        Both messages go out as a single executemany INSERT and the
+        conversation's updated_at/message_count (and title, when given) in a
+        single UPDATE, instead of two ORM flushes plus a separate touch of the
+        conversation. Core inserts skip the ChatMessage mapper events, so
+        message_count is bumped here directly.
+
+        ``sent_at`` is when the user sent their message; it defaults to now
+        and the reply is always stamped after it so history order is stable.
+        """
+        sent_at = sent_at or datetime.utcnow()
+        replied_at = max(datetime.utcnow(), sent_at + timedelta(microseconds=1))
+        user_message_id = uuid.uuid4()
+        assistant_message_id = uuid.uuid4()
+
+        values = {'updated_at': replied_at, 'message_count': Conversation.message_count + 2}
+        if title:
+            values['title'] = title[:255]
+
+        with DatabaseSession() as db_session:
+            db_session.execute(insert(ChatMessage.__table__), [
+                {
+                    'id': user_message_id,
+                    'conversation_id': conversation_id,
+                    'user_id': user_id,
+                    'role': 'user',
+                    'content': user_content,
+                    'clips_json': [],
+                    'attachments_json': attachments or [],
+                    'mentions': mentions or [],
+                    'model': None,
+                    'created_at': sent_at
+                },
+                {
+                    'id': assistant_message_id,
+                    'conversation_id': conversation_id,
+                    'user_id': None,
+                    'role': 'assistant',
+                    'content': assistant_content,
+                    'clips_json': clips or [],
+                    'attachments_json': [],
+                    'mentions': [],
+                    'model': model,
+                    'created_at': replied_at
+                }
+            ])
+            db_session.execute(
+                update(Conversation).where(Conversation.id == conversation_id).values(**values)
+            )
+            db_session.commit()
+
+        return {
+            'user_message_id': str(user_message_id),
+            'assistant_message_id': str(assistant_message_id),
+            'created_at': replied_at.isoformat()
+        }
+
+    @staticmethod
+    def _access_filter(conversation_id: UUID, user_id: UUID):
+        """Filter matching the conversation when the user owns it or was invited to it."""
+        return and_(
+            Conversation.id == conversation_id,
+            or_(
+                Conversation.user_id == user_id,
+                Conversation.participants.any(ChatParticipant.user_id == user_id)
+            )
+        )
+
+    @classmethod
+    def has_access(cls, conversation_id: UUID, user_id: UUID) -> bool:
+        """Check ownership or participation with a single SELECT EXISTS."""
+        with get_session() as session:
+            return _exists(
+                session, session.query(Conversation.id).filter(cls._access_filter(conversation_id, user_id))
+            )
+
+    @classmethod
+    def invite_participant(cls, conversation_id: UUID, inviter_id: UUID, user_id: UUID,
+                           role: str = 'member') -> Dict[str, Any]:
+        """Invite an active user to a conversation the inviter can access.
+
+        The access check, invitee lookup, duplicate check, insert and
+        is_collaborative update run as one CTE round-trip. Returns the
+        invitee and whether they were newly added (False if already in).
+        """
+        with DatabaseSession() as db_session:
+            row = db_session.execute(_INVITE_SQL, {
+                'participant_id': uuid.uuid4(),
+                'conversation_id': conversation_id,
+                'inviter_id': inviter_id,
+                'user_id': user_id,
+                'role': role,
+                'joined_at': datetime.utcnow()
+            }).one()
+
+            if not row.has_access:
+                raise PermissionError("Access denied")
+            if row.invitee_id is None:
+                raise ValueError(f"User not found: {user_id}")
+
+            return {
+                'user': {'id': str(row.invitee_id), 'name': row.invitee_name, 'email': row.invitee_email},
+                'added': row.added
+            }
+
+    @classmethod
+    def leave_conversation(cls, conversation_id: UUID, user_id: UUID) -> bool:
+        """Remove a user from a conversation; returns False if they were not a participant."""
+        with DatabaseSession() as db_session:
+            result = db_session.execute(
+                delete(ChatParticipant).where(
+                    ChatParticipant.conversation_id == conversation_id,
+                    ChatParticipant.user_id == user_id
+                )
+            )
+            return result.rowcount > 0
+
+    @classmethod
+    def get_participants(cls, conversation_id: UUID, user_id: UUID) -> Dict[str, Any]:
+        """Get the owner and invited participants of a conversation."""
+        with get_session() as session:
+            conversation = session.query(Conversation.id, Conversation.user_id).filter(
+                Conversation.id == conversation_id
+            ).first()
+            if not conversation:
+                raise ValueError(f"Conversation not found: {conversation_id}")
+
+            # One query for every participant and their user row
+            participants = session.query(ChatParticipant).options(
+                joinedload(ChatParticipant.user).load_only(User.id, User.name, User.email), *_strict_loading()
+            ).filter(ChatParticipant.conversation_id == conversation_id).all()
+
+            # Owners (the common case) never scan the participant list
+            is_owner = conversation.user_id == user_id
+            if not (is_owner or any(p.user_id == user_id for p in participants)):
+                raise PermissionError("Access denied")
+
+            owner = session.query(User.id, User.name, User.email).filter(
+                User.id == conversation.user_id
+            ).first() if conversation.user_id else None
+
+            return {
+                'owner': {
+                    'id': str(owner.id),
+                    'name': owner.name,
+                    'email': owner.email
+                } if owner else None,
+                'participants': [
+                    {
+                        'id': str(p.user_id),
+                        'name': p.user.name if p.user else 'Unknown',
+                        'email': p.user.email if p.user else None,
+                        'role': p.role,
+                        'joined_at': p.joined_at.isoformat() if p.joined_at else None
+                    }
+                    for p in participants
+                ],
+                'is_owner': is_owner
+            }
+
+    # Clip comment page sizes
+    DEFAULT_COMMENT_PAGE = 50
+    MAX_COMMENT_PAGE = 200
+
+    @classmethod
+    def get_clip_comments(cls, conversation_id: UUID, clip_index: int, limit: Optional[int] = None,
+                          before: Optional[datetime] = None, before_id: Optional[UUID] = None) -> Dict[str, Any]:
+        """Get one page of comments on a clip, oldest first.
+
+        Pages walk backwards from the newest comment using a (created_at, id)
+        keyset: pass the first comment's created_at/id of the previous page
+        as ``before``/``before_id`` to fetch the next older page.
+        """
+        limit = min(max(1, limit or cls.DEFAULT_COMMENT_PAGE), cls.MAX_COMMENT_PAGE)
+
+        with get_session() as session:
+            query = session.query(ClipComment).options(*_strict_loading()).filter(
+                ClipComment.conversation_id == conversation_id,
+                ClipComment.clip_index == clip_index
+            )
+            if before is not None:
+                if before_id is not None:
+                    query = query.filter(or_(
+                        ClipComment.created_at < before,
+                        and_(ClipComment.created_at == before, ClipComment.id < before_id)
+                    ))
+                else:
+                    query = query.filter(ClipComment.created_at < before)
+
+            # Newest-first so LIMIT walks the index; one extra row tells us if more exist
+            page = query.order_by(desc(ClipComment.created_at), desc(ClipComment.id)).limit(limit + 1).all()
+            has_more = len(page) > limit
+            comments = list(reversed(page[:limit]))
+
+            # Resolve every commenter in a single IN query
+            user_ids = {c.user_id for c in comments if c.user_id}
+            users = {
+                u.id: u for u in session.query(User.id, User.name).filter(User.id.in_(user_ids)).all()
+            } if user_ids else {}
+
+            return {
+                'comments': [
+                    {
+                        'id': str(c.id),
+                        'user_id': str(c.user_id),
+                        'user_name': users[c.user_id].name if c.user_id in users else 'Unknown',
+                        'content': c.content,
+                        'mentions': c.mentions or [],
+                        'is_regenerate_request': bool(c.is_regenerate_request),
+                        'created_at': c.created_at.isoformat() if c.created_at else None
+                    }
+                    for c in comments
+                ],
+                'has_more': has_more
+            }
+
+    # Rows fetched per round-trip when streaming a whole comment thread
+    COMMENT_STREAM_BATCH = 200
+
+    @classmethod
+    def iter_clip_comments(cls, conversation_id: UUID, clip_index: int) -> Iterator[Dict[str, Any]]:
+        """Yield every comment on a clip, oldest first, streaming rows from the server.
+
+        Intended for ResponseService.stream_json: rows are fetched in
+        batches with yield_per and serialized as they arrive, so long
+        threads never sit in memory as one list.
+        """
+        with get_session() as session:
+            rows = session.query(ClipComment, User.name).outerjoin(
+                User, User.id == ClipComment.user_id
+            ).options(*_strict_loading()).filter(
+                ClipComment.conversation_id == conversation_id,
+                ClipComment.clip_index == clip_index
+            ).order_by(ClipComment.created_at, ClipComment.id).yield_per(cls.COMMENT_STREAM_BATCH)
+
+            for c, user_name in rows:
+                yield {
+                    'id': str(c.id),
+                    'user_id': str(c.user_id),
+                    'user_name': user_name or 'Unknown',
+                    'content': c.content,
+                    'mentions': c.mentions or [],
+                    'is_regenerate_request': bool(c.is_regenerate_request),
+                    'created_at': c.created_at.isoformat() if c.created_at else None
+                }
+
+    @classmethod
+    def get_comments_mentioning(cls, conversation_id: UUID, mention: str) -> List[Dict[str, Any]]:
+        """Get a conversation's comments that @mention a name, oldest first (GIN index probe)."""
+        with get_session() as session:
+            comments = session.query(ClipComment).options(*_strict_loading()).filter(
+                ClipComment.conversation_id == conversation_id,
+                ClipComment.mentions.contains([mention])
+            ).order_by(ClipComment.created_at).all()
+
+            return [
+                {
+                    'id': str(c.id),
+                    'user_id': str(c.user_id),
+                    'clip_index': c.clip_index,
+                    'content': c.content,
+                    'is_regenerate_request': bool(c.is_regenerate_request),
+                    'created_at': c.created_at.isoformat() if c.created_at else None
+                }
+                for c in comments
+            ]
+
+    @classmethod
+    def add_clip_comment(cls, conversation_id: UUID, user_id: UUID, clip_index: int, content: str,
+                         message_id: Optional[UUID] = None, user_name: Optional[str] = None) -> Dict[str, Any]:
+        """Add a comment to a clip, recording its @mentions.
+
+        Postgres derives is_regenerate_request from the stored mentions.
+
+        Pass ``user_name`` (e.g. from AuthService.current_user()) to skip the
+        commenter lookup entirely.
+        """
+        mentions = _MENTION_RE.findall(content)
+
+        with DatabaseSession(expire_on_commit=False) as db_session:
+            if user_name is None:
+                user_name = AuthService.get_user_name(db_session, user_id) or 'Unknown'
+
+            comment = ClipComment(
+                conversation_id=conversation_id,
+                message_id=message_id,
+                user_id=user_id,
+                clip_index=clip_index,
+                content=content,
+                mentions=mentions
+            )
+            db_session.add(comment)
+            db_session.commit()
+
+            return {
+                'id': str(comment.id),
+                'user_id': str(user_id),
+                'user_name': user_name,
+                'content': content,
+                'mentions': mentions,
+                # Generated column, returned by the INSERT
+                'is_regenerate_request': bool(comment.is_regenerate_request),
+                'created_at': comment.created_at.isoformat() if comment.created_at else None
+            }
@@ -0,0 +1,219 @@
+"""
+Email Service
+
+Transactional email (account verification, team invites) sent through AWS SES.
+"""
+
+import json
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, List, Tuple
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from jinja2 import Environment
+
+from scripts.config_loader import get_config
+
+logger = logging.getLogger(__name__)
+
+# Bodies are compiled once at import; HTML templates escape names and URLs.
+# The same sources are registered as SES templates for bulk sends.
+_VERIFY_SUBJECT_SRC = "Verify your email address"
+_VERIFY_TEXT_SRC = (
+    "Hi {{ name }},\n\nConfirm your email address by opening this link:\n{{ url }}\n\n"
+    "The link expires in 24 hours.\n"
+)
+_VERIFY_HTML_SRC = (
+    "<p>Hi {{ name }},</p><p>Confirm your email address by opening this link:</p>"
+    "<p><a href=\"{{ url }}\">Verify email</a></p><p>The link expires in 24 hours.</p>"
+)
+_INVITE_SUBJECT_SRC = "{{ invited_by }} invited you to the Internal Platform"
+_INVITE_TEXT_SRC = (
+    "Hi {{ name }},\n\n{{ invited_by }} has invited you to the Internal Platform.\n\n"
+    "Sign in at {{ url }}\nTemporary password: {{ password }}\n\n"
+    "You will be asked to change it and set up two-factor authentication.\n"
+)
+_INVITE_HTML_SRC = (
+    "<p>Hi {{ name }},</p><p>{{ invited_by }} has invited you to the Internal Platform.</p>"
+    "<p>Sign in at <a href=\"{{ url }}\">{{ url }}</a><br>Temporary password: <code>{{ password }}</code></p>"
+    "<p>You will be asked to change it and set up two-factor authentication.</p>"
+)
+
+_HTML_ENV = Environment(autoescape=True)
+_TEXT_ENV = Environment(autoescape=False, keep_trailing_newline=True)
+
+_VERIFY_TEXT = _TEXT_ENV.from_string(_VERIFY_TEXT_SRC)
+_VERIFY_HTML = _HTML_ENV.from_string(_VERIFY_HTML_SRC)
+_INVITE_SUBJECT = _TEXT_ENV.from_string(_INVITE_SUBJECT_SRC)
+_INVITE_TEXT = _TEXT_ENV.from_string(_INVITE_TEXT_SRC)
+_INVITE_HTML = _HTML_ENV.from_string(_INVITE_HTML_SRC)
+
+
+class EmailService:
+    """Service for sending account emails through SES."""
+
+    _ses_client = None
+    _client_lock = threading.Lock()
+
+    # SES round-trips take ~1s; send on these threads so requests don't wait on them
+    MAIL_WORKERS = 8
+    _mail_pool = ThreadPoolExecutor(max_workers=MAIL_WORKERS, thread_name_prefix='mail')
+
+    # SES templates for bulk sends, and SES's cap on destinations per SendBulkTemplatedEmail call
+    VERIFY_TEMPLATE = 'MVVerifyEmail'
+    INVITE_TEMPLATE = 'MVInviteEmail'
+    BULK_BATCH_SIZE = 50
+
+    @classmethod
+    def get_ses_client(cls):
+        """Get the process-wide SES client, reusing its keep-alive connection pool."""
+        if cls._ses_client is None:
+            with cls._client_lock:
+                if cls._ses_client is None:
+                    config = get_config()
+                    cls._ses_client = boto3.client(
+                        "ses",
+                        region_name=config.aws_region,
+                        aws_access_key_id=config.aws_access_key or None,
+                        aws_secret_access_key=config.aws_secret_key or None,
+                        config=Config(
+                            max_pool_connections=50,
+                            retries={"max_attempts": 5, "mode": "adaptive"},
+                            tcp_keepalive=True,
+                        ),
+                    )
+        return cls._ses_client
+
+    @classmethod
+    def _send_email(cls, to_email: str, subject: str, text_body: str, html_body: str) -> bool:
+        """Send one email; returns False (and logs) instead of raising on failure."""
+        sender = get_config().email_sender
+        if not sender:
+            logger.warning("Email sender is not configured; not sending '%s' to %s", subject, to_email)
+            return False
+
+        try:
+            cls.get_ses_client().send_email(
+                Source=sender,
+                Destination={'ToAddresses': [to_email]},
+                Message={
+                    'Subject': {'Data': subject, 'Charset': 'UTF-8'},
+                    'Body': {
+                        'Text': {'Data': text_body, 'Charset': 'UTF-8'},
+                        'Html': {'Data': html_body, 'Charset': 'UTF-8'}
+                    }
+                }
+            )
+            return True
+        except ClientError as e:
+            logger.error("SES send to %s failed: %s", to_email, e)
+            return False
+
+    @classmethod
+    def _send_async(cls, to_email: str, subject: str, text_body: str, html_body: str) -> bool:
+        """Queue an email on the mail pool and return immediately; failures are logged."""
+        future = cls._mail_pool.submit(cls._send_email, to_email, subject, text_body, html_body)
+        future.add_done_callback(lambda f: cls._log_failure(to_email, subject, f))
+        return True
+
+    @staticmethod
+    def _log_failure(to_email: str, subject: str, future: Future) -> None:
+        """Log sends that raised outside of SES's own ClientError handling."""
+        error = future.exception()
+        if error is not None:
+            logger.error("Sending '%s' to %s failed: %s", subject, to_email, error)
+
+    @classmethod
+    def send_verification_email(cls, to_email: str, name: str, verify_url: str) -> bool:
+        """Queue the link a new user follows to verify their email address."""
+        return cls._send_async(
+            to_email,
+            _VERIFY_SUBJECT_SRC,
+            _VERIFY_TEXT.render(name=name, url=verify_url),
+            _VERIFY_HTML.render(name=name, url=verify_url)
+        )
+
+    @classmethod
+    def send_invite_email(cls, to_email: str, name: str, invited_by: str, login_url: str, temp_password: str) -> bool:
+        """Queue a team invite with the temporary password created by AuthService.invite_user."""
+        return cls._send_async(
+            to_email,
+            _INVITE_SUBJECT.render(invited_by=invited_by),
+            _INVITE_TEXT.render(name=name, invited_by=invited_by, url=login_url, password=temp_password),
+            _INVITE_HTML.render(name=name, invited_by=invited_by, url=login_url, password=temp_password)
+        )
+
+    @classmethod
+    def sync_ses_templates(cls) -> None:
+        """Create or update the SES templates used by the bulk senders (run once per deploy)."""
+        templates = {
+            cls.VERIFY_TEMPLATE: (_VERIFY_SUBJECT_SRC, _VERIFY_TEXT_SRC, _VERIFY_HTML_SRC),
+            cls.INVITE_TEMPLATE: (_INVITE_SUBJECT_SRC, _INVITE_TEXT_SRC, _INVITE_HTML_SRC),
+        }
+        client = cls.get_ses_client()
+        for name, (subject, text_part, html_part) in templates.items():
+            template = {'TemplateName': name, 'SubjectPart': subject, 'TextPart': text_part, 'HtmlPart': html_part}
+            try:
+                client.create_template(Template=template)
+            except ClientError as e:
+                if e.response.get('Error', {}).get('Code') != 'AlreadyExists':
+                    raise
+                client.update_template(Template=template)
+
+    @classmethod
+    def _send_bulk(cls, template: str, destinations: List[Tuple[str, dict]]) -> None:
+        """Send one SendBulkTemplatedEmail call (<= BULK_BATCH_SIZE destinations), logging per-recipient failures."""
+        sender = get_config().email_sender
+        if not sender:
+            logger.warning("Email sender is not configured; not sending %d '%s' emails", len(destinations), template)
+            return
+
+        try:
+            response = cls.get_ses_client().send_bulk_templated_email(
+                Source=sender,
+                Template=template,
+                DefaultTemplateData='{}',
+                Destinations=[
+                    {'Destination': {'ToAddresses': [to_email]}, 'ReplacementTemplateData': json.dumps(data)}
+                    for to_email, data in destinations
+                ]
+            )
+        except ClientError as e:
+            logger.error("SES bulk '%s' send to %d recipients failed: %s", template, len(destinations), e)
+            return
+
+        for (to_email, _), status in zip(destinations, response.get('Status', [])):
+            if status.get('Status') != 'Success':
+                logger.error("SES bulk '%s' send to %s failed: %s", template, to_email, status.get('Error'))
+
+    @classmethod
+    def _queue_bulk(cls, template: str, destinations: List[Tuple[str, dict]]) -> int:
+        """Queue destinations on the mail pool in BULK_BATCH_SIZE batches; returns how many were queued."""
+        for i in range(0, len(destinations), cls.BULK_BATCH_SIZE):
+            batch = destinations[i:i + cls.BULK_BATCH_SIZE]
+            future = cls._mail_pool.submit(cls._send_bulk, template, batch)
+            future.add_done_callback(lambda f, n=len(batch): cls._log_failure(f"{n} recipients", template, f))
+        return len(destinations)
+
+    @classmethod
+    def send_verification_emails_bulk(cls, recipients: Iterable[Tuple[str, str, str]]) -> int:
+        """Queue verification links for many (email, name, verify_url) users, up to 50 per SES call."""
+        return cls._queue_bulk(cls.VERIFY_TEMPLATE, [
+            (to_email, {'name': name, 'url': verify_url}) for to_email, name, verify_url in recipients
+        ])
+
+    @classmethod
+    def send_invite_emails_bulk(cls, invites: Iterable[Tuple[str, str, str]], invited_by: str, login_url: str) -> int:
+        """Queue invites for many (email, name, temp_password) users, up to 50 per SES call.
+
+        Uses the INVITE_TEMPLATE SES template (see sync_ses_templates), so
+        each batch is one API round trip instead of one per recipient.
+        Returns the number of invites queued.
+        """
+        return cls._queue_bulk(cls.INVITE_TEMPLATE, [
+            (to_email, {'name': name, 'invited_by': invited_by, 'url': login_url, 'password': temp_password})
+            for to_email, name, temp_password in invites
+        ])
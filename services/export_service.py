@@ -0,0 +1,128 @@
+"""
+Export Service
+
+Plain-text script exports and editor hand-off scripts for chat-generated clips.
+"""
+
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from flask import Response
+
+_JSON_BLOCK_RE = re.compile(r'```json.*?```', re.DOTALL)
+_DASHES_RE = re.compile(r'---')
+_UNSAFE_FILENAME_RE = re.compile(r'[^\w\- ]')
+
+
+class ExportService:
+    """Service for rendering scripts and clip lists as text documents."""
+
+    @staticmethod
+    def format_timestamp(seconds: float) -> str:
+        """Format seconds as HH:MM:SS.mmm."""
+        seconds = max(0.0, float(seconds or 0))
+        hours, remainder = divmod(seconds, 3600)
+        minutes, secs = divmod(remainder, 60)
+        return f"{int(hours):02d}:{int(minutes):02d}:{secs:06.3f}"
+
+    @staticmethod
+    def clean_script_text(script: str) -> str:
+        """Strip fenced JSON clip blocks and markdown rules from an AI-generated script."""
+        return _DASHES_RE.sub('', _JSON_BLOCK_RE.sub('', script or '')).strip()
+
+    @staticmethod
+    def safe_filename(title: str, extension: str = 'txt') -> str:
+        """Turn a conversation title into a download filename."""
+        name = _UNSAFE_FILENAME_RE.sub('', title or '').strip().replace(' ', '_')[:100]
+        return f"{name or 'script'}.{extension}"
+
+    @classmethod
+    def _iter_export_script(cls, title: str, script: str, clips: List[Dict[str, Any]],
+                            generated_at: Optional[datetime] = None) -> Iterator[str]:
+        """Yield the export file a section at a time: header and script, then one clip per chunk."""
+        generated_at = generated_at or datetime.utcnow()
+        yield (
+            f"{title}\n"
+            f"Generated: {generated_at.strftime('%Y-%m-%d %H:%M UTC')}\n"
+            + "=" * 60 + "\n\n"
+            "SCRIPT\n"
+            + "-" * 60 + "\n"
+            f"{cls.clean_script_text(script)}\n\n"
+        )
+
+        if clips:
+            yield "CLIPS\n" + "-" * 60 + "\n"
+            for i, clip in enumerate(clips, 1):
+                video_title = clip.get('video_title', 'Unknown')
+                start = cls.format_timestamp(clip.get('start_time', 0))
+                end = cls.format_timestamp(clip.get('end_time', 0))
+                text = clip.get('transcript_text') or clip.get('text') or ''
+                yield (
+                    f"{i}. {clip.get('title') or video_title}\n"
+                    f"   Source: {video_title}\n"
+                    f"   Time: {start} - {end}\n"
+                    f"   \"{text}\"\n\n"
+                )
+
+    @classmethod
+    def build_export_script(cls, title: str, script: str, clips: List[Dict[str, Any]],
+                            generated_at: Optional[datetime] = None) -> str:
+        """Render a conversation's script and its clips as a downloadable text file."""
+        return ''.join(cls._iter_export_script(title, script, clips, generated_at))
+
+    @classmethod
+    def export_script_response(cls, title: str, script: str, clips: List[Dict[str, Any]]) -> Response:
+        """Stream the export file as a chunked text/plain download."""
+        return Response(
+            cls._iter_export_script(title, script, clips),
+            mimetype='text/plain',
+            headers={'Content-Disposition': f'attachment; filename="{cls.safe_filename(title)}"'}
+        )
+
+    # Write buffer for edit scripts; one flush per MiB instead of per clip
+    EDIT_SCRIPT_BUFFER_SIZE = 1 << 20
+
+    @classmethod
+    def _iter_edit_script(cls, clips: Iterable[Dict[str, Any]], title: str) -> Iterator[str]:
+        """Yield the EDIT_SCRIPT.txt cut list a clip at a time, footer totals last."""
+        yield f"{title}\n" + "=" * 60 + "\n\n"
+
+        count = 0
+        total_duration = 0.0
+        for i, clip in enumerate(clips, 1):
+            start_time = float(clip.get('start_time', 0) or 0)
+            end_time = float(clip.get('end_time', 0) or 0)
+            duration = max(0.0, end_time - start_time)
+            count = i
+            total_duration += duration
+            yield (
+                f"CLIP {i:03d}: {clip.get('video_title', 'Unknown')}\n"
+                f"  File: clip_{i:03d}.mp4\n"
+                f"  In:   {cls.format_timestamp(start_time)}\n"
+                f"  Out:  {cls.format_timestamp(end_time)}\n"
+                f"  Duration: {duration:.1f}s\n"
+                f"  Text: {clip.get('transcript_text') or clip.get('text') or ''}\n\n"
+            )
+
+        yield (
+            "=" * 60 + "\n"
+            f"Total clips: {count}\n"
+            f"Total duration: {cls.format_timestamp(total_duration)}\n"
+        )
+
+    @classmethod
+    def build_edit_script(cls, clips: Iterable[Dict[str, Any]], title: str = "Edit Script") -> str:
+        """Render the EDIT_SCRIPT.txt cut list an editor follows to assemble the clips."""
+        return ''.join(cls._iter_edit_script(clips, title))
+
+    @classmethod
+    def write_edit_script(cls, output_dir: Union[str, Path], clips: Iterable[Dict[str, Any]],
+                          title: str = "Edit Script") -> Path:
+        """Write EDIT_SCRIPT.txt into output_dir without building it in memory first."""
+        path = Path(output_dir) / "EDIT_SCRIPT.txt"
+        with open(path, 'w', encoding='utf-8', buffering=cls.EDIT_SCRIPT_BUFFER_SIZE) as f:
+            for fragment in cls._iter_edit_script(clips, title):
+                f.write(fragment)
+        return path
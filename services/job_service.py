@@ -0,0 +1,110 @@
+"""
+Job Service
+
+Runs slow work (AI calls) off the request thread so handlers can return
+202 Accepted with a job id and let the client poll for the result.
+"""
+
+import itertools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import delete, update
+
+from scripts.db import BackgroundJob, DatabaseSession, get_session
+from services.auth_service import AuthService
+
+logger = logging.getLogger(__name__)
+
+
+class JobService:
+    """Service for submitting and polling background jobs.
+
+    Jobs run on this worker's thread pool, but their state and result live
+    in the background_jobs table, so a poll can land on any worker.
+    """
+
+    MAX_WORKERS = 8
+    # Finished jobs stay pollable for an hour; older rows are swept every PURGE_INTERVAL submits
+    JOB_TTL_SECONDS = 3600
+    PURGE_INTERVAL = 100
+
+    _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='job')
+    _submits = itertools.count(1)
+
+    @classmethod
+    def submit(cls, user_id: Optional[UUID], func: Callable[..., Any], *args, **kwargs) -> str:
+        """Run func(*args, **kwargs) in the background for a user and return its job id.
+
+        func must return something JSON-serializable. The job row is
+        committed before the work starts, so it is pollable immediately.
+        """
+        with DatabaseSession(expire_on_commit=False) as db_session:
+            job = BackgroundJob(job_type=func.__name__, user_id=user_id, status='running')
+            db_session.add(job)
+        job_id = job.id
+
+        cls._executor.submit(cls._run, job_id, func, args, kwargs)
+        if next(cls._submits) % cls.PURGE_INTERVAL == 0:
+            cls._executor.submit(cls.purge_expired)
+        return str(job_id)
+
+    @classmethod
+    def _run(cls, job_id: UUID, func: Callable[..., Any], args: tuple, kwargs: Dict[str, Any]) -> None:
+        """Run a job and record its outcome; failures are logged, not raised into the pool."""
+        try:
+            result = func(*args, **kwargs)
+            values = {'status': 'completed', 'result': result}
+        except Exception as error:
+            logger.error("Background job %s failed: %s", job_id, error)
+            values = {'status': 'failed', 'error_message': str(error)}
+
+        try:
+            with DatabaseSession() as db_session:
+                db_session.execute(
+                    update(BackgroundJob).where(BackgroundJob.id == job_id).values(completed_at=datetime.utcnow(), **values)
+                )
+        except Exception as error:
+            logger.error("Failed to record outcome of background job %s: %s", job_id, error)
+
+    @classmethod
+    def get_status(cls, job_id: str, user_id: Optional[UUID]) -> Optional[Dict[str, Any]]:
+        """Get a job's state and, once finished, its result.
+
+        Returns None for unknown or expired jobs and for jobs submitted by
+        another user. Failures report only that the job failed; the
+        exception text stays in the server log.
+        """
+        job_uuid = AuthService.parse_uuid(job_id)
+        if job_uuid is None or user_id is None:
+            return None
+
+        with get_session() as db_session:
+            job = db_session.query(BackgroundJob.status, BackgroundJob.result).filter(
+                BackgroundJob.id == job_uuid,
+                BackgroundJob.user_id == user_id,
+                BackgroundJob.created_at >= datetime.utcnow() - timedelta(seconds=cls.JOB_TTL_SECONDS)
+            ).first()
+        if job is None:
+            return None
+
+        status = {'job_id': str(job_uuid), 'status': job.status}
+        if job.status == 'completed':
+            status['result'] = job.result
+        elif job.status == 'failed':
+            status['error'] = 'Job failed'
+        return status
+
+    @classmethod
+    def purge_expired(cls) -> None:
+        """Delete job rows older than JOB_TTL_SECONDS."""
+        try:
+            with DatabaseSession() as db_session:
+                db_session.execute(delete(BackgroundJob).where(
+                    BackgroundJob.created_at < datetime.utcnow() - timedelta(seconds=cls.JOB_TTL_SECONDS)
+                ))
+        except Exception as error:
+            logger.error("Failed to purge expired background jobs: %s", error)
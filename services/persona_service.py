@@ -0,0 +1,59 @@
+"""
+Persona Service
+
+Lists personas with the counts of the content linked to them.
+"""
+
+from typing import Any, Dict, List
+
+from sqlalchemy import func
+
+from scripts.db import Document, Persona, SocialPost, Video, get_session
+
+
+class PersonaService:
+    """Service for persona listings."""
+
+    @staticmethod
+    def list_personas() -> List[Dict[str, Any]]:
+        """Get active personas with their document, social post and video counts.
+
+        Each count is one GROUP BY across all listed personas (videos are
+        matched on speaker name), so the listing costs four queries however
+        many personas there are.
+        """
+        with get_session() as session:
+            personas = session.query(
+                Persona.id, Persona.name, Persona.description, Persona.avatar_url,
+                Persona.speaker_name_in_videos, Persona.created_at
+            ).filter(Persona.is_active == 1).order_by(Persona.name).all()
+            if not personas:
+                return []
+
+            persona_ids = [p.id for p in personas]
+            speakers = {p.speaker_name_in_videos for p in personas if p.speaker_name_in_videos}
+
+            doc_counts = dict(session.query(Document.persona_id, func.count()).filter(
+                Document.persona_id.in_(persona_ids)
+            ).group_by(Document.persona_id).all())
+            post_counts = dict(session.query(SocialPost.persona_id, func.count()).filter(
+                SocialPost.persona_id.in_(persona_ids)
+            ).group_by(SocialPost.persona_id).all())
+            video_counts = dict(session.query(Video.speaker, func.count()).filter(
+                Video.speaker.in_(speakers)
+            ).group_by(Video.speaker).all()) if speakers else {}
+
+        return [
+            {
+                'id': p.id,
+                'name': p.name,
+                'description': p.description,
+                'avatar_url': p.avatar_url,
+                'speaker_name_in_videos': p.speaker_name_in_videos,
+                'created_at': p.created_at,
+                'document_count': doc_counts.get(p.id, 0),
+                'post_count': post_counts.get(p.id, 0),
+                'video_count': video_counts.get(p.speaker_name_in_videos, 0),
+            }
+            for p in personas
+        ]
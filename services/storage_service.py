@@ -0,0 +1,100 @@
+"""
+Storage Service
+
+Shared S3 client and cached presigned URLs for media previews.
+"""
+
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+
+from scripts.config_loader import get_config
+from services.cache_service import TTLCache
+
+
+class StorageService:
+    """Service for S3 access and presigned URL generation."""
+
+    PRESIGNED_URL_EXPIRES = 3600
+    # Hand out cached URLs only while they have at least 5 minutes left to run
+    PRESIGNED_URL_CACHE_TTL = 3300
+
+    # Large source videos come down as parallel 8 MiB ranged GETs
+    TRANSFER_CONFIG = TransferConfig(
+        multipart_threshold=8 * 1024 * 1024,
+        multipart_chunksize=8 * 1024 * 1024,
+        max_concurrency=8,
+        use_threads=True,
+    )
+
+    # botocore's default pool of 10 queues gallery fan-out; size for ~50 concurrent requests
+    MAX_POOL_CONNECTIONS = 50
+
+    _s3_client = None
+    _client_lock = threading.Lock()
+    _presigned_urls = TTLCache(ttl_seconds=PRESIGNED_URL_CACHE_TTL, max_entries=10_000)
+
+    @classmethod
+    def get_s3_client(cls):
+        """Get the process-wide S3 client (s3v4 signing, pooled keep-alive connections)."""
+        if cls._s3_client is None:
+            with cls._client_lock:
+                if cls._s3_client is None:
+                    config = get_config()
+                    cls._s3_client = boto3.client(
+                        "s3",
+                        region_name=config.aws_region,
+                        aws_access_key_id=config.aws_access_key or None,
+                        aws_secret_access_key=config.aws_secret_key or None,
+                        config=Config(
+                            signature_version="s3v4",
+                            s3={"addressing_style": "virtual", "use_accelerate_endpoint": False},
+                            max_pool_connections=cls.MAX_POOL_CONNECTIONS,
+                            retries={"max_attempts": 3, "mode": "adaptive"},
+                            tcp_keepalive=True,
+                        ),
+                    )
+        return cls._s3_client
+
+    @classmethod
+    def download_file(cls, bucket: str, key: str, filename: str) -> None:
+        """Download an object to a local file using concurrent multipart transfers."""
+        cls.get_s3_client().download_file(bucket, key, filename, Config=cls.TRANSFER_CONFIG)
+
+    @classmethod
+    def sign_url(cls, bucket: str, key: str, expires_in: Optional[int] = None,
+                 download_filename: Optional[str] = None) -> str:
+        """Sign a fresh presigned GET URL.
+
+        ``download_filename`` adds a Content-Disposition: attachment override
+        so browsers save the object instead of playing it.
+        """
+        params = {"Bucket": bucket, "Key": key}
+        if download_filename:
+            params["ResponseContentDisposition"] = f'attachment; filename="{download_filename}"'
+        return cls.get_s3_client().generate_presigned_url(
+            "get_object", Params=params, ExpiresIn=expires_in or cls.PRESIGNED_URL_EXPIRES
+        )
+
+    @classmethod
+    def presigned_url(cls, bucket: str, key: str, expires_in: Optional[int] = None,
+                      download_filename: Optional[str] = None) -> str:
+        """Get a presigned GET URL, reusing one signed within the cache TTL."""
+        expires_in = expires_in or cls.PRESIGNED_URL_EXPIRES
+        return cls._presigned_urls.get_or_set(
+            (bucket, key, expires_in, download_filename),
+            lambda: cls.sign_url(bucket, key, expires_in, download_filename)
+        )
+
+    @classmethod
+    def presigned_urls(cls, locations: Iterable[Tuple[str, str]],
+                       expires_in: Optional[int] = None) -> Dict[Tuple[str, str], str]:
+        """Get presigned GET URLs for many (bucket, key) pairs, signing each distinct pair at most once.
+
+        Responses that list many segments of the same few recordings sign
+        one URL per object rather than one per row.
+        """
+        return {location: cls.presigned_url(*location, expires_in) for location in dict.fromkeys(locations)}
@@ -1,6 +1,435 @@
-"""Transcript Service - Stub Implementation"""
+"""
+Transcript Service
+
+Keyword search over video transcripts and audio recordings, used to build
+the context sent to the AI for chat and script generation.
+"""
+
+import bisect
+import re
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import case, func, update
+from sqlalchemy.orm import Bundle
+
+from scripts.db import AudioRecording, AudioSegment, DatabaseSession, Transcript, TranscriptSegment, Video, get_session
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_KEYWORD_RE = re.compile(r'\b\w{3,}\b')
+# Words too common in chat requests to be worth searching for
+_STOP_WORDS = frozenset({
+    'the', 'and', 'for', 'are', 'but', 'not', 'you', 'all', 'can', 'her', 'was', 'one',
+    'our', 'out', 'has', 'have', 'had', 'what', 'when', 'where', 'who', 'why', 'how',
+    'this', 'that', 'with', 'from', 'they', 'them', 'then', 'than', 'about', 'into',
+    'some', 'any', 'would', 'could', 'should', 'will', 'just', 'like', 'make', 'find',
+    'show', 'give', 'get', 'want', 'need', 'video', 'videos', 'clip', 'clips', 'script'
+})
+
+
+def _matches(tsv_column, tsquery):
+    """``tsv_column @@ tsquery``; served by the GIN index on the segment's text_tsv."""
+    return tsv_column.op('@@')(tsquery)
+
+
+def _segment_columns(model, *extra) -> Bundle:
+    """Just the segment columns search results show, as a row with attribute access (no ORM objects)."""
+    return Bundle('seg', model.start_time, model.end_time, model.text, model.speaker, *extra)
+
+
+def _any_keyword(keywords: List[str]):
+    """A tsquery matching text containing any of the keywords (OR of their stems)."""
+    return func.to_tsquery('english', ' | '.join(keywords))
 
 
 class TranscriptService:
-    """Stub implementation for Transcript Service."""
-    pass
\ No newline at end of file
+    """Service for searching transcript and audio content."""
+
+    MAX_KEYWORDS = 10
+
+    @classmethod
+    def _extract_keywords(cls, query: str) -> List[str]:
+        """Pull distinct search keywords (3+ letters, no stop words) from a query."""
+        keywords = dict.fromkeys(w for w in _KEYWORD_RE.findall(query.lower()) if w not in _STOP_WORDS)
+        return list(keywords)[:cls.MAX_KEYWORDS]
+
+    @classmethod
+    def search_transcripts_for_context(cls, query: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Find video transcript segments matching the query's keywords."""
+        keywords = cls._extract_keywords(query)
+        if not keywords:
+            return []
+
+        with get_session() as session:
+            rows = session.query(_segment_columns(TranscriptSegment), Video.id, Video.filename, Video.speaker).join(
+                Transcript, Transcript.id == TranscriptSegment.transcript_id
+            ).join(
+                Video, Video.id == Transcript.video_id
+            ).filter(
+                Transcript.status == "completed",
+                _matches(TranscriptSegment.text_tsv, _any_keyword(keywords))
+            ).order_by(Video.id, TranscriptSegment.start_time).limit(limit).all()
+
+            return [
+                {
+                    'video_id': str(video_id),
+                    'video_title': filename,
+                    'speaker': seg.speaker or speaker,
+                    'start_time': float(seg.start_time),
+                    'end_time': float(seg.end_time),
+                    'text': seg.text
+                }
+                for seg, video_id, filename, speaker in rows
+            ]
+
+    @classmethod
+    def search_transcripts(cls, query: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Find transcript segments containing the words of ``query`` across all videos.
+
+        Matching is full-text (stemmed, via the text_tsv GIN index) rather
+        than a substring scan. The transcript and video are joined in, so
+        the results come back in one round trip.
+        """
+        with get_session() as session:
+            rows = session.query(
+                _segment_columns(TranscriptSegment, TranscriptSegment.id, TranscriptSegment.transcript_id),
+                Transcript.video_id, Video.filename
+            ).join(
+                Transcript, Transcript.id == TranscriptSegment.transcript_id
+            ).join(
+                Video, Video.id == Transcript.video_id
+            ).filter(
+                _matches(TranscriptSegment.text_tsv, func.plainto_tsquery('english', query))
+            ).limit(limit).all()
+
+            return [
+                {
+                    'segment_id': str(seg.id),
+                    'transcript_id': str(seg.transcript_id),
+                    'video_id': str(video_id),
+                    'video_filename': filename,
+                    'start_time': float(seg.start_time),
+                    'end_time': float(seg.end_time),
+                    'text': seg.text,
+                    'speaker': seg.speaker
+                }
+                for seg, video_id, filename in rows
+            ]
+
+    @classmethod
+    def search_audio_for_context(cls, query: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Find audio recording segments matching the query, best matches first.
+
+        One query matches any keyword and scores each segment by how many
+        keywords it contains (a CASE per keyword), so Postgres ranks and
+        limits in a single scan instead of one round trip per keyword.
+        """
+        keywords = cls._extract_keywords(query)
+        if not keywords:
+            return []
+
+        keyword_hits = [
+            case((_matches(AudioSegment.text_tsv, func.plainto_tsquery('english', kw)), 1), else_=0)
+            for kw in keywords
+        ]
+        score = sum(keyword_hits[1:], keyword_hits[0]).label('score')
+
+        with get_session() as session:
+            # Only the recording fields the results show, joined per matching segment
+            rows = session.query(
+                _segment_columns(AudioSegment, AudioSegment.audio_id), AudioRecording.title, AudioRecording.filename,
+                AudioRecording.speakers,
+                AudioRecording.recording_date, score, *keyword_hits
+            ).join(
+                AudioRecording, AudioRecording.id == AudioSegment.audio_id
+            ).filter(
+                AudioRecording.status == "transcribed",
+                _matches(AudioSegment.text_tsv, _any_keyword(keywords))
+            ).order_by(score.desc()).limit(limit).all()
+
+            # Rows arrive best-first, so the first segment per (audio_id, start, end) is the one kept
+            results_by_span: Dict[Tuple[UUID, Any, Any], Dict[str, Any]] = {}
+            for seg, title, filename, speakers, recording_date, seg_score, *hits in rows:
+                key = (seg.audio_id, seg.start_time, seg.end_time)
+                if key in results_by_span:
+                    continue
+                results_by_span[key] = {
+                    'audio_id': str(seg.audio_id),
+                    'audio_title': title or filename,
+                    'speakers': speakers or [],
+                    'recording_date': recording_date.isoformat() if recording_date else None,
+                    'speaker': seg.speaker,
+                    'start_time': float(seg.start_time),
+                    'end_time': float(seg.end_time),
+                    'text': seg.text,
+                    'score': seg_score,
+                    'matched_keywords': [kw for kw, hit in zip(keywords, hits) if hit]
+                }
+
+            return list(results_by_span.values())
+
+    @classmethod
+    def _latest_transcript_id(cls, session, video_id: UUID) -> Optional[UUID]:
+        """Get the id of a video's most recent completed transcript."""
+        row = session.query(Transcript.id).filter(
+            Transcript.video_id == video_id,
+            Transcript.status == "completed"
+        ).order_by(Transcript.created_at.desc()).first()
+        return row.id if row else None
+
+    @classmethod
+    def get_transcript_text(cls, video_id: UUID, max_chars: int = 5000) -> str:
+        """Get the opening ``max_chars`` of a video's transcript as one string."""
+        with get_session() as session:
+            transcript_id = cls._latest_transcript_id(session, video_id)
+            if not transcript_id:
+                return ''
+            # Stream text only and stop as soon as max_chars is covered
+            rows = session.query(TranscriptSegment.text).filter(
+                TranscriptSegment.transcript_id == transcript_id
+            ).order_by(TranscriptSegment.start_time).yield_per(200)
+
+            parts = []
+            total = 0
+            for (text,) in rows:
+                if not text:
+                    continue
+                parts.append(text)
+                total += len(text) + 1
+                if total >= max_chars:
+                    break
+            return ' '.join(parts)[:max_chars]
+
+    @classmethod
+    def get_opening_segments(cls, video_id: UUID, limit: int = 100) -> List[Dict[str, Any]]:
+        """Get the first ``limit`` segments of a video's transcript (start_time, speaker, text)."""
+        with get_session() as session:
+            transcript_id = cls._latest_transcript_id(session, video_id)
+            if not transcript_id:
+                return []
+            rows = session.query(TranscriptSegment.start_time, TranscriptSegment.speaker, TranscriptSegment.text).filter(
+                TranscriptSegment.transcript_id == transcript_id
+            ).order_by(TranscriptSegment.start_time).limit(limit).all()
+            return [
+                {'start_time': float(r.start_time), 'speaker': r.speaker, 'text': r.text}
+                for r in rows
+            ]
+
+    @staticmethod
+    def _rebuild_full_text(db_session, transcript_id: UUID) -> int:
+        """Recompute a transcript's full_text/word_count from its segment texts; returns word_count."""
+        # Only the text column is needed to rebuild; skip hydrating segment objects
+        texts = [t for (t,) in db_session.query(TranscriptSegment.text).filter(
+            TranscriptSegment.transcript_id == transcript_id
+        ).order_by(TranscriptSegment.start_time).all() if t]
+        full_text = ' '.join(texts)
+        word_count = full_text.count(' ') + 1 if full_text else 0
+
+        # Write back without loading the transcript row (and its metadata JSONB)
+        db_session.execute(
+            update(Transcript).where(Transcript.id == transcript_id).values(full_text=full_text, word_count=word_count)
+        )
+        return word_count
+
+    @classmethod
+    def update_segment(cls, segment_id: UUID, text: Optional[str] = None,
+                       speaker: Optional[str] = None) -> Dict[str, Any]:
+        """Edit a transcript segment and rebuild its transcript's full_text/word_count."""
+        with DatabaseSession() as db_session:
+            segment = db_session.query(TranscriptSegment).filter(TranscriptSegment.id == segment_id).first()
+            if not segment:
+                raise ValueError(f"Segment not found: {segment_id}")
+
+            if text is not None:
+                segment.text = text
+            if speaker is not None:
+                segment.speaker = speaker
+            db_session.flush()
+
+            word_count = cls._rebuild_full_text(db_session, segment.transcript_id)
+
+            return {
+                'id': str(segment.id),
+                'transcript_id': str(segment.transcript_id),
+                'text': segment.text,
+                'speaker': segment.speaker,
+                'start_time': float(segment.start_time),
+                'end_time': float(segment.end_time),
+                'word_count': word_count
+            }
+
+    # Slack when matching an edited time range to stored segments
+    SEGMENT_MATCH_TOLERANCE = 0.5
+
+    @classmethod
+    def replace_segment_range(cls, video_id: UUID, start_time: float, end_time: float, text: str) -> Dict[str, Any]:
+        """Replace the text spoken between start_time and end_time with a single segment.
+
+        Segments inside the range (within SEGMENT_MATCH_TOLERANCE) are
+        preferred; if none fit, any overlapping segments are used. Both
+        candidate sets come from one query. The first match keeps the new
+        text and is stretched to cover the rest, which are removed with one
+        bulk DELETE.
+        """
+        tolerance = cls.SEGMENT_MATCH_TOLERANCE
+        with DatabaseSession() as db_session:
+            transcript_id = cls._latest_transcript_id(db_session, video_id)
+            if not transcript_id:
+                raise ValueError(f"No transcript for video: {video_id}")
+
+            overlapping = db_session.query(TranscriptSegment).filter(
+                TranscriptSegment.transcript_id == transcript_id,
+                TranscriptSegment.start_time < end_time + tolerance,
+                TranscriptSegment.end_time > start_time - tolerance
+            ).order_by(TranscriptSegment.start_time).all()
+
+            segments = [
+                seg for seg in overlapping
+                if float(seg.start_time) >= start_time - tolerance and float(seg.end_time) <= end_time + tolerance
+            ] or overlapping
+            if not segments:
+                raise ValueError("No transcript segments in that time range")
+
+            first = segments[0]
+            first.text = text
+            first.end_time = max(seg.end_time for seg in segments)
+            db_session.flush()
+
+            if len(segments) > 1:
+                db_session.query(TranscriptSegment).filter(
+                    TranscriptSegment.id.in_([seg.id for seg in segments[1:]])
+                ).delete(synchronize_session=False)
+                db_session.expire_all()
+
+            word_count = cls._rebuild_full_text(db_session, transcript_id)
+
+            return {
+                'id': str(first.id),
+                'text': first.text,
+                'start_time': float(first.start_time),
+                'end_time': float(first.end_time),
+                'merged_segments': len(segments),
+                'word_count': word_count
+            }
+
+    # AI-cited video ids this many characters off a real id are treated as typos of it
+    MAX_VIDEO_ID_TYPOS = 2
+
+    @staticmethod
+    def _within_typos(candidate: str, target: str, max_typos: int) -> bool:
+        """True when two equal-length ids differ in at most max_typos positions, stopping at the first excess."""
+        typos = 0
+        for a, b in zip(candidate, target):
+            if a != b:
+                typos += 1
+                if typos > max_typos:
+                    return False
+        return True
+
+    # Seconds of transcript either side of a verified clip returned as its context
+    CLIP_CONTEXT_WINDOW = 15.0
+    # Leading characters of a clip's quoted text used to find it in the transcript
+    CLIP_MATCH_CHARS = 60
+
+    @classmethod
+    def validate_clips_against_database(cls, clips: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Keep the AI's suggested clips that point at real videos, repairing slightly mangled ids.
+
+        An unknown id is only compared with known ids of the same length
+        (ids are bucketed by length up front), and each comparison stops as
+        soon as it exceeds MAX_VIDEO_ID_TYPOS differences.
+
+        Each kept clip's quoted text is then looked up in its video's latest
+        transcript. A match sets ``verified``, snaps the clip to the matching
+        segment's start, and attaches the transcript within
+        CLIP_CONTEXT_WINDOW seconds as ``context``. Transcripts and segments
+        for every clip are fetched in two queries and matched in memory.
+        """
+        with get_session() as session:
+            known_ids = {str(video_id) for (video_id,) in session.query(Video.id).all()}
+
+        ids_by_len: Dict[int, List[str]] = defaultdict(list)
+        for video_id in known_ids:
+            ids_by_len[len(video_id)].append(video_id)
+
+        valid = []
+        for clip in clips:
+            video_id = str(clip.get('video_id') or '').strip().lower()
+            if video_id not in known_ids:
+                video_id = next((
+                    candidate for candidate in ids_by_len.get(len(video_id), ())
+                    if cls._within_typos(candidate, video_id, cls.MAX_VIDEO_ID_TYPOS)
+                ), None)
+                if video_id is None:
+                    continue
+            valid.append({**clip, 'video_id': video_id})
+
+        if valid:
+            cls._verify_clip_text(valid)
+        return valid
+
+    @classmethod
+    def _verify_clip_text(cls, clips: List[Dict[str, Any]]) -> None:
+        """Match clips' quoted text against their transcripts in place (see validate_clips_against_database)."""
+        with get_session() as session:
+            # Ascending created_at, so the latest completed transcript per video wins
+            transcript_ids = {
+                str(video_id): transcript_id
+                for transcript_id, video_id in session.query(Transcript.id, Transcript.video_id).filter(
+                    Transcript.video_id.in_({clip['video_id'] for clip in clips}),
+                    Transcript.status == "completed"
+                ).order_by(Transcript.created_at)
+            }
+            segments_by_transcript: Dict[UUID, List[Tuple[float, float, str, str]]] = defaultdict(list)
+            if transcript_ids:
+                for transcript_id, start, end, text in session.query(
+                    TranscriptSegment.transcript_id, TranscriptSegment.start_time,
+                    TranscriptSegment.end_time, TranscriptSegment.text
+                ).filter(
+                    TranscriptSegment.transcript_id.in_(transcript_ids.values())
+                ).order_by(TranscriptSegment.transcript_id, TranscriptSegment.start_time):
+                    segments_by_transcript[transcript_id].append((float(start), float(end), text, _WHITESPACE_RE.sub(' ', text).lower()))
+
+        starts_by_transcript = {tid: [seg[0] for seg in segs] for tid, segs in segments_by_transcript.items()}
+        window = cls.CLIP_CONTEXT_WINDOW
+
+        for clip in clips:
+            clip['verified'] = False
+            transcript_id = transcript_ids.get(clip['video_id'])
+            phrase = _WHITESPACE_RE.sub(' ', str(clip.get('text') or '')).strip().lower()[:cls.CLIP_MATCH_CHARS]
+            if transcript_id is None or not phrase:
+                continue
+
+            segments = segments_by_transcript[transcript_id]
+            match = next((seg for seg in segments if seg[3].find(phrase) != -1), None)
+            if match is None:
+                continue
+
+            start, end, _, _ = match
+            starts = starts_by_transcript[transcript_id]
+            lo = bisect.bisect_left(starts, start - window)
+            hi = bisect.bisect_right(starts, start + window)
+            clip['verified'] = True
+            clip['start_time'] = start
+            clip['end_time'] = max(float(clip.get('end_time') or 0), end)
+            clip['context'] = ' '.join(seg[2] for seg in segments[lo:hi])
+
+    @classmethod
+    def gather_chat_context(cls, query: str, include_audio: bool = True,
+                            audio_limit: int = 50) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Run the transcript and audio searches concurrently for a chat turn.
+
+        The two searches are independent database round-trips, so wall time
+        is the slower of the two rather than their sum. Pass
+        ``include_audio=False`` (e.g. for copy-writing intents) to skip the
+        audio search entirely.
+        """
+        if not include_audio:
+            return cls.search_transcripts_for_context(query), []
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            transcript_future = executor.submit(cls.search_transcripts_for_context, query)
+            audio_future = executor.submit(cls.search_audio_for_context, query, audio_limit)
+            return transcript_future.result(), audio_future.result()
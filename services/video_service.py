@@ -1,6 +1,301 @@
-"""Video Service - Stub Implementation"""
+"""
+Video Service
+
+Media lookups for the video and audio preview endpoints.
+"""
+
+import io
+import logging
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import and_, func, update
+from sqlalchemy.orm import load_only
+
+from scripts.db import AudioRecording, AudioSegment, DatabaseSession, Transcript, TranscriptSegment, Video, get_session
+from services.cache_service import TTLCache
+from services.storage_service import StorageService
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def _pyav():
+    """Import PyAV on first use (it loads the libav* shared libraries), or None if not installed.
+
+    On-demand thumbnails need it for in-process decode; without it missing
+    thumbnails stay missing.
+    """
+    try:
+        import av
+    except ImportError:
+        return None
+    return av
 
 
 class VideoService:
-    """Stub implementation for Video Service."""
-    pass
\ No newline at end of file
+    """Service for resolving video and audio media to playable URLs."""
+
+    # S3 keys never change for a given row, so locations are kept for a day
+    LOCATION_CACHE_TTL = 24 * 3600
+    _locations = TTLCache(ttl_seconds=LOCATION_CACHE_TTL, max_entries=10_000)
+    _thumbnail_locations = TTLCache(ttl_seconds=LOCATION_CACHE_TTL, max_entries=10_000)
+
+    # Per-(video, kind) URLs are handed out while at least 10 minutes of their hour remain
+    VIDEO_URL_CACHE_TTL = StorageService.PRESIGNED_URL_EXPIRES - 600
+    _video_urls = TTLCache(ttl_seconds=VIDEO_URL_CACHE_TTL, max_entries=20_000)
+
+    # Library list pages show the newest rows first. Ids and dates are left
+    # as UUID/date/datetime for ResponseService.json_response to serialize.
+    LIST_LIMIT = 500
+
+    @classmethod
+    def list_videos(cls, limit: int = LIST_LIMIT) -> List[Dict[str, Any]]:
+        """List videos, newest first, with whether each has a completed transcript.
+
+        The transcript check is an outer join counted per video, so the page
+        is one query instead of one transcripts lookup per row; only the
+        listed columns are loaded (no metadata JSONB or S3 fields).
+        """
+        with get_session() as session:
+            rows = session.query(Video, func.count(Transcript.id).label('transcript_count')).options(
+                load_only(Video.id, Video.filename, Video.speaker, Video.event_name, Video.event_date,
+                          Video.duration_seconds, Video.status, Video.created_at)
+            ).outerjoin(
+                Transcript, and_(Transcript.video_id == Video.id, Transcript.status == "completed")
+            ).group_by(Video.id).order_by(Video.created_at.desc()).limit(limit).all()
+
+            return [
+                {
+                    'id': video.id,
+                    'filename': video.filename,
+                    'speaker': video.speaker,
+                    'event_name': video.event_name,
+                    'event_date': video.event_date,
+                    'duration_seconds': float(video.duration_seconds) if video.duration_seconds else None,
+                    'status': video.status,
+                    'has_transcript': transcript_count > 0,
+                    'created_at': video.created_at
+                }
+                for video, transcript_count in rows
+            ]
+
+    @classmethod
+    def list_transcripts(cls, limit: int = LIST_LIMIT) -> List[Dict[str, Any]]:
+        """List transcripts, newest first, with their video's filename and segment count in one query."""
+        with get_session() as session:
+            rows = session.query(
+                Transcript.id, Transcript.video_id, Transcript.status, Transcript.word_count, Transcript.created_at,
+                Video.filename, func.count(TranscriptSegment.id).label('segment_count')
+            ).join(
+                Video, Video.id == Transcript.video_id
+            ).outerjoin(
+                TranscriptSegment, TranscriptSegment.transcript_id == Transcript.id
+            ).group_by(Transcript.id, Video.filename).order_by(Transcript.created_at.desc()).limit(limit).all()
+
+            return [
+                {
+                    'id': row.id,
+                    'video_id': row.video_id,
+                    'video_filename': row.filename,
+                    'status': row.status,
+                    'word_count': row.word_count,
+                    'segment_count': row.segment_count,
+                    'created_at': row.created_at
+                }
+                for row in rows
+            ]
+
+    @classmethod
+    def list_audio_recordings(cls, limit: int = LIST_LIMIT) -> List[Dict[str, Any]]:
+        """List audio recordings, newest first, with their segment counts in one query."""
+        with get_session() as session:
+            rows = session.query(AudioRecording, func.count(AudioSegment.id).label('segment_count')).options(
+                load_only(AudioRecording.id, AudioRecording.title, AudioRecording.filename, AudioRecording.speakers,
+                          AudioRecording.recording_date, AudioRecording.duration_seconds, AudioRecording.status,
+                          AudioRecording.created_at)
+            ).outerjoin(
+                AudioSegment, AudioSegment.audio_id == AudioRecording.id
+            ).group_by(AudioRecording.id).order_by(AudioRecording.created_at.desc()).limit(limit).all()
+
+            return [
+                {
+                    'id': recording.id,
+                    'title': recording.title or recording.filename,
+                    'speakers': recording.speakers or [],
+                    'recording_date': recording.recording_date,
+                    'duration_seconds': float(recording.duration_seconds) if recording.duration_seconds else None,
+                    'status': recording.status,
+                    'segment_count': segment_count,
+                    'created_at': recording.created_at
+                }
+                for recording, segment_count in rows
+            ]
+
+    @classmethod
+    def _s3_location(cls, model, media_id: UUID) -> Optional[Tuple[str, str]]:
+        """Get (bucket, key) for a Video or AudioRecording, cached per id."""
+        cache_key = (model.__tablename__, media_id)
+        location = cls._locations.get(cache_key)
+        if location is None:
+            with get_session() as session:
+                row = session.query(model.s3_bucket, model.s3_key).filter(model.id == media_id).first()
+            if not row:
+                return None
+            location = (row.s3_bucket, row.s3_key)
+            cls._locations.set(cache_key, location)
+        return location
+
+    @classmethod
+    def _thumbnail_location(cls, video_id: UUID) -> Optional[Tuple[str, str]]:
+        """Get (bucket, thumbnail key) for a video, cached per id once a thumbnail exists.
+
+        Videos without a thumbnail are not cached, so one generated later is
+        picked up on the next request.
+        """
+        location = cls._thumbnail_locations.get(video_id)
+        if location is None:
+            with get_session() as session:
+                row = session.query(Video.s3_bucket, Video.thumbnail_s3_key).filter(Video.id == video_id).first()
+            if not row or not row.thumbnail_s3_key:
+                return None
+            location = (row.s3_bucket, row.thumbnail_s3_key)
+            cls._thumbnail_locations.set(video_id, location)
+        return location
+
+    @classmethod
+    def _video_url(cls, video_id: UUID, kind: str) -> Optional[str]:
+        """Get a thumbnail/preview/download URL for a video, cached per (video_id, kind).
+
+        A URL cache hit skips both the videos lookup and the URL signing;
+        after it expires the S3 location is still cached, so re-signing
+        needs no query either. URLs are signed fresh on a miss so the cache
+        age never exceeds the URL's own validity.
+        """
+        cache_key = (video_id, kind)
+        url = cls._video_urls.get(cache_key)
+        if url is not None:
+            return url
+
+        if kind == 'thumb':
+            location = cls._thumbnail_location(video_id)
+            if not location:
+                return None
+            url = StorageService.sign_url(*location)
+        elif kind == 'download':
+            # The download filename is only needed here, so fetch it with the location
+            with get_session() as session:
+                row = session.query(Video.s3_bucket, Video.s3_key, Video.original_filename).filter(
+                    Video.id == video_id
+                ).first()
+            if not row:
+                return None
+            url = StorageService.sign_url(row.s3_bucket, row.s3_key, download_filename=row.original_filename)
+        else:
+            location = cls._s3_location(Video, video_id)
+            if not location:
+                return None
+            url = StorageService.sign_url(*location)
+
+        cls._video_urls.set(cache_key, url)
+        return url
+
+    @classmethod
+    def get_video_thumbnail_url(cls, video_id: UUID) -> Optional[str]:
+        """Get a presigned URL for a video's pre-generated thumbnail, or None if it has none."""
+        return cls._video_url(video_id, 'thumb')
+
+    @classmethod
+    def get_video_preview_url(cls, video_id: UUID) -> Optional[str]:
+        """Get a presigned URL for a video, or None if it does not exist."""
+        return cls._video_url(video_id, 'preview')
+
+    @classmethod
+    def get_video_download_url(cls, video_id: UUID) -> Optional[str]:
+        """Get a presigned URL that downloads a video under its original filename."""
+        return cls._video_url(video_id, 'download')
+
+    @classmethod
+    def get_audio_preview_url(cls, audio_id: UUID) -> Optional[str]:
+        """Get a presigned URL for an audio recording, or None if it does not exist."""
+        location = cls._s3_location(AudioRecording, audio_id)
+        return StorageService.presigned_url(*location) if location else None
+
+    @classmethod
+    def get_audio_preview_urls(cls, audio_ids: List[UUID]) -> Dict[UUID, str]:
+        """Get preview URLs for many audio recordings: one query for uncached locations, one signature per recording."""
+        locations = {}
+        missing = []
+        for audio_id in dict.fromkeys(audio_ids):
+            location = cls._locations.get((AudioRecording.__tablename__, audio_id))
+            if location is None:
+                missing.append(audio_id)
+            else:
+                locations[audio_id] = location
+
+        if missing:
+            with get_session() as session:
+                rows = session.query(AudioRecording.id, AudioRecording.s3_bucket, AudioRecording.s3_key).filter(
+                    AudioRecording.id.in_(missing)
+                ).all()
+            for row in rows:
+                location = (row.s3_bucket, row.s3_key)
+                cls._locations.set((AudioRecording.__tablename__, row.id), location)
+                locations[row.id] = location
+
+        urls = StorageService.presigned_urls(locations.values())
+        return {audio_id: urls[location] for audio_id, location in locations.items()}
+
+    # On-demand thumbnails match scripts/generate_thumbnails.py: 400px wide JPEGs
+    THUMBNAIL_WIDTH = 400
+    THUMBNAIL_QUALITY = 80
+
+    @classmethod
+    def get_or_generate_thumbnail_url(cls, video_id: UUID) -> Optional[str]:
+        """Get a video's thumbnail URL, generating the thumbnail in-process if it has none.
+
+        Generation decodes a single keyframe ~10% into the video with PyAV
+        straight from a presigned URL (no ffmpeg process, no full download),
+        stores it at thumbnails/{video_id}.jpg and records the key, so
+        later requests take the cached path. Returns None when PyAV is not
+        installed or generation fails.
+        """
+        url = cls.get_video_thumbnail_url(video_id)
+        if url is not None or _pyav() is None:
+            return url
+
+        location = cls._s3_location(Video, video_id)
+        if not location:
+            return None
+
+        try:
+            thumbnail_key = cls._generate_thumbnail(video_id, *location)
+        except Exception as e:
+            logger.warning("On-demand thumbnail for %s failed: %s", video_id, e)
+            return None
+
+        with DatabaseSession() as db_session:
+            db_session.execute(update(Video).where(Video.id == video_id).values(thumbnail_s3_key=thumbnail_key))
+        return cls.get_video_thumbnail_url(video_id)
+
+    @classmethod
+    def _generate_thumbnail(cls, video_id: UUID, bucket: str, key: str) -> str:
+        """Decode one keyframe with PyAV, encode it as JPEG with Pillow and upload it."""
+        with _pyav().open(StorageService.sign_url(bucket, key)) as container:
+            stream = container.streams.video[0]
+            stream.codec_context.skip_frame = 'NONKEY'
+            if container.duration:
+                container.seek(int(container.duration * 0.1))
+            frame = next(container.decode(stream))
+            image = frame.to_image()
+
+        height = max(1, round(image.height * cls.THUMBNAIL_WIDTH / image.width))
+        buffer = io.BytesIO()
+        image.resize((cls.THUMBNAIL_WIDTH, height)).save(buffer, 'JPEG', quality=cls.THUMBNAIL_QUALITY)
+
+        thumbnail_key = f"thumbnails/{video_id}.jpg"
+        StorageService.get_s3_client().put_object(
+            Bucket=bucket, Key=thumbnail_key, Body=buffer.getvalue(), ContentType='image/jpeg'
+        )
+        return thumbnail_key